@@ -14,10 +14,10 @@ import threading
 import os
 import glob
 
-from synthap.catalogs.loader import load_catalogs
 from synthap import runs_dir 
 from synthap.config.settings import settings
 from synthap.config.runtime_config import load_runtime_config
+from synthap.ui_cache import cached_catalogs
 from synthap.xero.oauth import build_authorize_url, TokenStore
 
 # ------------------- Streamlit Utilities -------------------
@@ -185,13 +185,16 @@ class XeroAuthBackend:
     def get_token_data():
         """Get token data if it exists."""
         token_path = XeroAuthBackend.get_token_path()
-        if token_path.exists():
-            try:
-                with open(token_path, 'r') as f:
-                    return json.load(f)
-            except Exception:
-                pass
-        return None
+        if not token_path.exists():
+            return None
+        if settings.token_file:
+            # Parsed once per change to the file, not on every status check
+            return TokenStore.load()
+        try:
+            with open(token_path, 'r') as f:
+                return json.load(f)
+        except Exception:
+            return None
     
     @staticmethod
     def get_tenant_id():
@@ -249,11 +252,20 @@ class XeroAuthBackend:
 
 def load_latest_run_stats() -> dict:
     """Load statistics from the most recent run."""
-    runs = sorted([p for p in runs_dir().iterdir() if p.is_dir()], reverse=True)
-    if not runs:
+    root = runs_dir()
+    # A new run directory changes the parent's mtime, so it shows up at once;
+    # the TTL still picks up files finishing inside an existing run.
+    return _latest_run_stats(str(root), root.stat().st_mtime_ns)
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _latest_run_stats(root: str, mtime_ns: int) -> dict:
+    with os.scandir(root) as it:
+        latest = max((e.name for e in it if e.is_dir()), default=None)
+    if latest is None:
         return {}
     
-    latest_run = runs[0]
+    latest_run = Path(root) / latest
     try:
         invoices = pd.read_parquet(latest_run / "invoices.parquet")
         lines = pd.read_parquet(latest_run / "invoice_lines.parquet")
@@ -281,7 +293,9 @@ def render_connection_status() -> None:
     # Check various system components
     backend_ok = True  # catalogs loaded successfully
     openai_ok = bool(settings.openai_api_key)
-    xero_ok = XeroAuthBackend.is_authenticated()
+    # Read the token file once per render rather than once per status check
+    tenant_id = XeroAuthBackend.get_tenant_id()
+    xero_ok = tenant_id is not None
     
     # Create status columns with more detail
     status_cols = st.columns(3)
@@ -306,7 +320,6 @@ def render_connection_status() -> None:
     # Xero Status
     with status_cols[2]:
         if xero_ok:
-            tenant_id = XeroAuthBackend.get_tenant_id()
             st.success("Xero: Connected")
             st.caption(f"Tenant ID: {tenant_id}")
             
@@ -515,7 +528,7 @@ def main() -> None:
         # Only show regular dashboard if not in auth flow
         if not st.session_state.get("xero_auth_flow"):
             # Load data
-            cat = load_catalogs(settings.data_dir)
+            cat = cached_catalogs(str(settings.data_dir))
             run_stats = load_latest_run_stats()
             
             # Render dashboard sections
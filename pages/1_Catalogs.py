@@ -1,17 +1,16 @@
 """Catalog browsing page."""
 
 from __future__ import annotations
-import asyncio
 import time
 import uuid
 from pathlib import Path
-from typing import Optional, List
+from typing import List
 
 import pandas as pd
 import streamlit as st
 
 from synthap.config.settings import settings
-from synthap.catalogs.loader import load_catalogs, Vendor, Item
+from synthap.catalogs.loader import Vendor, Item
 from synthap.catalogs.manager import (
     backup_catalogs, 
     restore_catalogs,
@@ -25,6 +24,8 @@ from synthap.ai.synthgen import (
     preview_synthetic_data,
     apply_synthetic_data
 )
+from synthap.ui_cache import cached_catalogs
+from synthap.xero.client import run_with_client
 
 def runs_dir() -> Path:
     """Get the runs directory path."""
@@ -32,111 +33,85 @@ def runs_dir() -> Path:
     p.mkdir(parents=True, exist_ok=True)
     return p
 
-def latest_run_id() -> Optional[str]:
-    """Get the latest run ID."""
-    candidates = [p.name for p in runs_dir().iterdir() if p.is_dir()]
-    return sorted(candidates)[-1] if candidates else None
-
 def format_currency(value: float) -> str:
     return f"${value:,.2f}"
 
+_VENDOR_COLUMNS = {
+    'name': 'Vendor Name',
+    'id': 'ID',
+    'is_supplier': 'Is Supplier',
+    'payment_terms': 'Payment Terms',
+    'xero_contact_id': 'Xero Contact ID',
+    'xero_account_number': 'Xero Account #'
+}
+
+_ITEM_COLUMNS = {
+    'name': 'Item Name',
+    'code': 'Item Code',
+    'unit_price': 'Unit Price',
+    'account_code': 'Account Code',
+    'tax_code': 'Tax Code',
+    'price_variance_pct': 'Price Variance'
+}
+
+_MAPPING_COLUMNS = ['Vendor Name', 'Vendor ID', 'Item Name', 'Item Code', 'Unit Price']
+
 def format_vendor_data(vendors: List[Vendor]) -> pd.DataFrame:
     if not vendors:
         # Return an empty DataFrame with the right columns
-        return pd.DataFrame(columns=[
-            'Vendor Name', 'ID', 'Is Supplier', 'Payment Terms', 
-            'Xero Contact ID', 'Xero Account #'
-        ])
-    
-    df = pd.DataFrame([v.model_dump() for v in vendors])
-    # Reorder and rename columns for better presentation
-    columns = {
-        'name': 'Vendor Name',
-        'id': 'ID',
-        'is_supplier': 'Is Supplier',
-        'payment_terms': 'Payment Terms',
-        'xero_contact_id': 'Xero Contact ID',
-        'xero_account_number': 'Xero Account #'
-    }
-    
-    # Only include columns that exist in the DataFrame
-    rename_cols = {k: v for k, v in columns.items() if k in df.columns}
-    df = df.rename(columns=rename_cols)
-    
-    # Select only columns that exist
-    available_cols = [col for col in columns.values() if col in df.columns]
-    return df[available_cols]
+        return pd.DataFrame(columns=list(_VENDOR_COLUMNS.values()))
+
+    # Build each display column straight from the models, already renamed
+    # and in display order
+    return pd.DataFrame({
+        label: [getattr(v, field) for v in vendors]
+        for field, label in _VENDOR_COLUMNS.items()
+    })
 
 
 def format_item_data(items: List[Item]) -> pd.DataFrame:
     if not items:
         # Return an empty DataFrame with the right columns
-        return pd.DataFrame(columns=[
-            'Item Name', 'Item Code', 'Unit Price', 
-            'Account Code', 'Tax Code', 'Price Variance'
-        ])
-    
-    df = pd.DataFrame([i.model_dump() for i in items])
-    # Format currency and percentages
-    if 'unit_price' in df.columns:
-        df['unit_price'] = df['unit_price'].apply(format_currency)
-    if 'price_variance_pct' in df.columns:
-        df['price_variance_pct'] = df['price_variance_pct'].apply(lambda x: f"{x*100:.1f}%")
-    
-    # Reorder and rename columns
-    columns = {
-        'name': 'Item Name',
-        'code': 'Item Code',
-        'unit_price': 'Unit Price',
-        'account_code': 'Account Code',
-        'tax_code': 'Tax Code',
-        'price_variance_pct': 'Price Variance'
-    }
-    
-    # Only include columns that exist in the DataFrame
-    rename_cols = {k: v for k, v in columns.items() if k in df.columns}
-    df = df.rename(columns=rename_cols)
-    
-    # Select only columns that exist
-    available_cols = [col for col in columns.values() if col in df.columns]
-    return df[available_cols]
+        return pd.DataFrame(columns=list(_ITEM_COLUMNS.values()))
+
+    # Currency and percentages are formatted while the columns are built
+    return pd.DataFrame({
+        'Item Name': [i.name for i in items],
+        'Item Code': [i.code for i in items],
+        'Unit Price': [format_currency(i.unit_price) for i in items],
+        'Account Code': [i.account_code for i in items],
+        'Tax Code': [i.tax_code for i in items],
+        'Price Variance': [f"{i.price_variance_pct*100:.1f}%" for i in items],
+    })
 
 
 
 def format_vendor_items(cat) -> pd.DataFrame:
-    # Create a more detailed mapping view
-    records = []
-    
-    if not hasattr(cat, 'vendor_items') or not cat.vendor_items:
-        # Return empty DataFrame with proper columns
-        return pd.DataFrame(columns=[
-            'Vendor Name', 'Vendor ID', 'Item Name', 'Item Code', 'Unit Price'
-        ])
-    
-    for vid, codes in cat.vendor_items.items():
-        vendor = next((v for v in cat.vendors if v.id == vid), None)
+    # Create a more detailed mapping view, one column list per field
+    columns = {name: [] for name in _MAPPING_COLUMNS}
+    vendors = {v.id: v for v in cat.vendors}
+    items = cat.items_by_code
+
+    for vid, codes in (getattr(cat, 'vendor_items', None) or {}).items():
+        vendor = vendors.get(vid)
         if not vendor:
             continue
-        
+
         for code in codes:
-            item = next((i for i in cat.items if i.code == code), None)
+            item = items.get(code)
             if not item:
                 continue
-                
-            records.append({
-                'Vendor Name': vendor.name,
-                'Vendor ID': vid,
-                'Item Name': item.name,
-                'Item Code': code,
-                'Unit Price': format_currency(item.unit_price)
-            })
-            
-    if not records:
-        return pd.DataFrame(columns=[
-            'Vendor Name', 'Vendor ID', 'Item Name', 'Item Code', 'Unit Price'
-        ])
-        
-    return pd.DataFrame(records)
+
+            columns['Vendor Name'].append(vendor.name)
+            columns['Vendor ID'].append(vid)
+            columns['Item Name'].append(item.name)
+            columns['Item Code'].append(code)
+            columns['Unit Price'].append(format_currency(item.unit_price))
+
+    if not columns['Vendor ID']:
+        return pd.DataFrame(columns=_MAPPING_COLUMNS)
+
+    return pd.DataFrame(columns)
 
 def format_payment_terms(payment_terms) -> str:
     """Format payment terms for display."""
@@ -201,7 +176,7 @@ def render_data_generation_ui():
                         items_per_vendor=items_per_vendor
                     )
                     
-                    preview_data = asyncio.run(preview_synthetic_data(request))
+                    preview_data = run_with_client(preview_synthetic_data(request))
                     
                     # Store in session state
                     st.session_state.preview_data = preview_data
@@ -302,7 +277,7 @@ def render_data_generation_ui():
                 progress_container.text("Starting process...")
                 
                 # Run the apply function
-                results = asyncio.run(apply_synthetic_data(
+                results = run_with_client(apply_synthetic_data(
                     st.session_state.preview_data, 
                     override_existing=st.session_state.override_existing
                 ))
@@ -429,8 +404,8 @@ def main() -> None:
     # Fix items.yaml file if needed
     fix_items_yaml(settings.data_dir)
     
-    # Load catalogs after fix
-    cat = load_catalogs(settings.data_dir)
+    # Load catalogs after fix; edits made by the fix change the cache key
+    cat = cached_catalogs(str(settings.data_dir))
     
     with browse_tab:
         vendors_tab, items_tab, mapping_tab = st.tabs([
@@ -2,7 +2,6 @@
 
 from __future__ import annotations
 from pathlib import Path
-from typing import Optional
 import yaml
 import pandas as pd
 import streamlit as st
@@ -21,11 +20,6 @@ def runs_dir() -> Path:
     p.mkdir(parents=True, exist_ok=True)
     return p
 
-def latest_run_id() -> Optional[str]:
-    """Get the latest run ID."""
-    candidates = [p.name for p in runs_dir().iterdir() if p.is_dir()]
-    return sorted(candidates)[-1] if candidates else None
-
 def _load(path) -> dict:
     if not path.exists():
         return {}
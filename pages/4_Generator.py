@@ -9,6 +9,7 @@ from synthap.config.settings import settings
 
 import random
 import secrets
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, datetime
 from typing import Optional
 
@@ -16,9 +17,7 @@ import streamlit as st
 from slugify import slugify
 
 from synthap.ai.planner import plan_from_query
-from synthap.catalogs.loader import load_catalogs
 from synthap import runs_dir
-from synthap.config.runtime_config import load_runtime_config
 from synthap.config.settings import settings
 from synthap.data.storage import to_rows, write_parquet
 from synthap.engine.generator import generate_from_plan
@@ -26,19 +25,14 @@ from synthap.engine.payments import select_invoices_to_pay
 from synthap.engine.validators import validate_invoices
 from synthap.nlp.parser import parse_nlp_to_query, QueryScopeError
 from synthap.reports.report import write_json
-
-def latest_run_id() -> Optional[str]:
-    """Get the latest run ID."""
-    candidates = [p.name for p in runs_dir().iterdir() if p.is_dir()]
-    return sorted(candidates)[-1] if candidates else None
-
+from synthap.ui_cache import cached_catalogs, cached_runtime_config
 
 def _vendor_options(cat):
-    return [v.name for v in cat.vendors]
+    return cat.vendor_names
 
 
 def _vendor_name_to_id(cat, names):
-    by_name = {v.name: v.id for v in cat.vendors}
+    by_name = cat.vendor_ids_by_name
     return [by_name[n] for n in names if n in by_name]
 
 
@@ -80,8 +74,8 @@ def extract_nlp_payment_count(query_text, cat):
 def main() -> None:
     st.title("Generate Invoices")
     
-    cat = load_catalogs(settings.data_dir)
-    cfg = load_runtime_config(settings.data_dir)
+    cat = cached_catalogs(str(settings.data_dir))
+    cfg = cached_runtime_config(str(settings.data_dir))
 
     # Example queries section
     st.subheader("Example Queries")
@@ -380,8 +374,6 @@ def main() -> None:
             inv_df, line_df = to_rows(invoices)
             base = runs_dir() / run_id
             base.mkdir(parents=True, exist_ok=True)
-            write_parquet(inv_df, base / "invoices.parquet")
-            write_parquet(line_df, base / "invoice_lines.parquet")
 
             all_refs = [inv.reference for inv in invoices]
             rng = random.Random(seed)
@@ -401,8 +393,6 @@ def main() -> None:
                     cfg.payments.pay_when_unspecified,
                     rng,
                 )
-            
-            write_json({"run_id": run_id, "references": pay_refs}, base / "to_pay.json")
 
             report = {
                 "run_id": run_id,
@@ -429,7 +419,21 @@ def main() -> None:
                     "ai_descriptions": enable_ai_descriptions if cfg.ai.enabled else False,
                 }
             }
-            write_json(report, base / "generation_report.json")
+
+            # The four artifacts are independent files, so write them in parallel
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                writes = [
+                    pool.submit(write_parquet, inv_df, base / "invoices.parquet"),
+                    pool.submit(write_parquet, line_df, base / "invoice_lines.parquet"),
+                    pool.submit(
+                        write_json,
+                        {"run_id": run_id, "references": pay_refs},
+                        base / "to_pay.json",
+                    ),
+                    pool.submit(write_json, report, base / "generation_report.json"),
+                ]
+            for write in writes:
+                write.result()
 
             # Display success message with seed information for reproducibility
             st.success(f"""
@@ -9,6 +9,27 @@ from datetime import datetime, timedelta
 from synthap.logs import read_logs, logs_dir
 
 
+def _log_file_key(log_type: str) -> tuple[int, int]:
+    """(mtime_ns, size) of a log file, used to key the read cache."""
+    try:
+        stat = (logs_dir() / f"{log_type}.log").stat()
+    except FileNotFoundError:
+        return 0, 0
+    return stat.st_mtime_ns, stat.st_size
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _read_logs_cached(
+    log_type: str,
+    max_lines: int,
+    search_text: str | None,
+    level_filter: str | None,
+    file_key: tuple[int, int],
+) -> list[dict]:
+    """Parsed log tail; ``file_key`` re-reads it once the file changes."""
+    return read_logs(log_type, max_lines, search_text, level_filter)
+
+
 def format_log_entries(logs, colorize=True):
     """Format log entries for display with optional colorization."""
     if not logs:
@@ -84,11 +105,12 @@ def render_log_tab(log_type: str):
     level_to_filter = None if level_filter == "All" else level_filter
     
     # Get logs with filters
-    logs = read_logs(
-        log_type=log_type.lower(), 
-        max_lines=max_entries,
-        search_text=search_text if search_text else None,
-        level_filter=level_to_filter
+    logs = _read_logs_cached(
+        log_type.lower(),
+        int(max_entries),
+        search_text if search_text else None,
+        level_to_filter,
+        _log_file_key(log_type.lower()),
     )
     
     # Display log entries
@@ -1,36 +1,44 @@
 """Insert generated invoices into Xero."""
 
 from __future__ import annotations
-import asyncio
-import json
+import os
 import time
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Any
 
+import orjson
 import pandas as pd
 import streamlit as st
 
 from synthap import runs_dir
-from synthap.config.runtime_config import load_runtime_config
 from synthap.config.settings import settings
+from synthap.data.storage import STAGED_INVOICE_COLUMNS, STAGED_LINE_COLUMNS, read_parquet
 from synthap.engine.payments import generate_payments
 from synthap.logs import log_xero, log_error, log_system, read_logs
-from synthap.xero.client import post_invoices, post_payments
+from synthap.reports.report import write_json
+from synthap.ui_cache import cached_runtime_config
+from synthap.xero.client import (
+    post_invoices,
+    post_invoices_batched,
+    post_payments,
+    run_with_client,
+)
+from synthap.xero.mapper import map_staged_invoices, vendor_ids_by_reference
 from synthap.xero.oauth import TokenStore
 
 
 def _available_runs() -> list[str]:
     """Get all available runs, sorted by name (most recent first)."""
-    return sorted([p.name for p in runs_dir().iterdir() if p.is_dir()], reverse=True)
+    with os.scandir(runs_dir()) as it:
+        return sorted([e.name for e in it if e.is_dir()], reverse=True)
 
 
 def _load_json(path: Path) -> dict | None:
     """Load JSON file if it exists."""
     if not path.exists():
         return None
-    with open(path, encoding="utf-8") as f:
-        return json.load(f)
+    return orjson.loads(path.read_bytes())
 
 
 def is_authenticated() -> bool:
@@ -49,80 +57,53 @@ async def insert_to_xero(run_id: str) -> Dict[str, Any]:
         raise ValueError(f"Missing invoice data files in {base}")
         
     # Load the invoice data
-    inv_df = pd.read_parquet(inv_path)
-    line_df = pd.read_parquet(line_path)
-    cfg = load_runtime_config(settings.data_dir)
+    inv_df = read_parquet(inv_path, STAGED_INVOICE_COLUMNS)
+    line_df = read_parquet(line_path, STAGED_LINE_COLUMNS)
+    cfg = cached_runtime_config(str(settings.data_dir))
     
     # Create the payload for Xero
-    payloads = []
-    for ref, lines in line_df.groupby("reference"):
-        head = inv_df[inv_df["reference"] == ref].iloc[0]
-        line_items = []
-        for _, ln in lines.iterrows():
-            line_items.append({
-                "Description": ln["description"],
-                "Quantity": float(ln["quantity"]),
-                "UnitAmount": float(ln["unit_amount"]),
-                "AccountCode": str(ln["account_code"]),
-                "TaxType": str(ln["tax_type"]),
-                "LineAmount": float(ln["line_amount"]),
-            })
-        payloads.append({
-            "Type": "ACCPAY",
-            "Contact": {"ContactID": head["contact_id"]},
-            "CurrencyCode": head["currency"],
-            "LineItems": line_items,
-            "Date": head["date"],
-            "DueDate": head["due_date"],
-            "Reference": ref,
-            "InvoiceNumber": head.get("invoice_number", ref),
-            "Status": head["status"],
-        })
+    payloads = map_staged_invoices(inv_df, line_df)
+    vendor_by_ref = vendor_ids_by_reference(inv_df)
     
-    # Insert invoices in batches
-    batch_size = 50
     total_ok, total_fail = 0, 0
     invoice_records = []
     xero_log = []
     
     log_system(f"Starting insertion of {len(payloads)} invoices from run {run_id}")
     
-    # Insert invoices
-    for i in range(0, len(payloads), batch_size):
-        batch = payloads[i : i + batch_size]
-        try:
-            resp = await post_invoices(batch)
-            xero_log.append({"action": "post_invoices", "request": batch, "response": resp})
-            batch_invoices = resp.get("Invoices", [])
-            total_ok += len(batch_invoices)
-            for inv in batch_invoices:
-                ref = inv.get("Reference")
-                if ref is not None:
-                    match = inv_df[inv_df["reference"] == ref]
-                    if not match.empty:
-                        inv["Vendor"] = match.iloc[0].get("vendor_id")
-                invoice_records.append(inv)
-            log_xero(f"Successfully inserted batch {i//batch_size} with {len(batch_invoices)} invoices")
-        except Exception as e:
+    # Insert invoices concurrently; results are handled in submission order
+    results = await post_invoices_batched(payloads, post_invoices)
+    for n, (batch, resp) in enumerate(results):
+        if isinstance(resp, BaseException):
             total_fail += len(batch)
-            err = str(e)
+            err = str(resp)
             xero_log.append({"action": "post_invoices", "request": batch, "error": err})
-            log_xero(f"Batch {i//batch_size} failed: {err}", "ERROR")
-            log_error(f"Failed to insert invoice batch: {err}", exception=e)
+            log_xero(f"Batch {n} failed: {err}", "ERROR")
+            log_error(f"Failed to insert invoice batch: {err}", exception=resp)
+            continue
+        xero_log.append({"action": "post_invoices", "request": batch, "response": resp})
+        batch_invoices = resp.get("Invoices", [])
+        total_ok += len(batch_invoices)
+        for inv in batch_invoices:
+            ref = inv.get("Reference")
+            if ref in vendor_by_ref:
+                inv["Vendor"] = vendor_by_ref[ref]
+            invoice_records.append(inv)
+        log_xero(f"Successfully inserted batch {n} with {len(batch_invoices)} invoices")
     
     # Save invoice records for payment reference
     inv_report_path = base / "invoice_report.json"
-    with open(inv_report_path, "w") as f:
-        json.dump({"run_id": run_id, "invoices": invoice_records}, f, indent=2)
+    write_json({"run_id": run_id, "invoices": invoice_records}, inv_report_path)
     
     # Process payments if any
     payment_records = []
     to_pay_path = base / "to_pay.json"
     if to_pay_path.exists():
         try:
-            to_pay_data = json.loads(to_pay_path.read_text())
+            to_pay_data = orjson.loads(to_pay_path.read_bytes())
             to_pay_refs = to_pay_data.get("references", [])
-            records_to_pay = [r for r in invoice_records if r.get("Reference") in to_pay_refs]
+            to_pay_set = frozenset(to_pay_refs)
+            records_to_pay = [r for r in invoice_records if r.get("Reference") in to_pay_set]
             
             payments = generate_payments(
                 records_to_pay,
@@ -160,12 +141,9 @@ async def insert_to_xero(run_id: str) -> Dict[str, Any]:
     payment_report_path = base / "payment_report.json"
     xero_log_path = base / "xero_log.json"
     
-    with open(report_path, "w") as f:
-        json.dump(report, f, indent=2)
-    with open(payment_report_path, "w") as f:
-        json.dump({"run_id": run_id, "payments": payment_records}, f, indent=2)
-    with open(xero_log_path, "w") as f:
-        json.dump({"run_id": run_id, "events": xero_log}, f, indent=2)
+    write_json(report, report_path, indent=True)
+    write_json({"run_id": run_id, "payments": payment_records}, payment_report_path)
+    write_json({"run_id": run_id, "events": xero_log}, xero_log_path)
     
     log_system(f"Completed Xero insertion for run {run_id}: {total_ok} successful, {total_fail} failed")
     return report
@@ -250,7 +228,8 @@ def main() -> None:
         st.caption("This will insert all invoices from the selected run into Xero.")
         
         # Xero status
-        tenant_id = TokenStore.load().get("tenant_id") if TokenStore.load() else None
+        token = TokenStore.load()
+        tenant_id = token.get("tenant_id") if token else None
         st.info(f"Connected to Xero organization: {tenant_id}")
     
     # Process insertion
@@ -270,7 +249,7 @@ def main() -> None:
                 
                 # Insert invoices
                 st.write("Inserting invoices...")
-                result = asyncio.run(insert_to_xero(selected_run))
+                result = run_with_client(insert_to_xero(selected_run))
                 
                 st.write(f"✅ Inserted {result['inserted_success']} invoices")
                 
@@ -1,8 +1,11 @@
+from functools import cached_property
 from pathlib import Path
 import yaml
 from pydantic import BaseModel, field_validator
 from typing import List, Dict, Any, Optional
 
+from ..paths import yaml_mtime_ns
+
 class Vendor(BaseModel):
     id: str
     name: str
@@ -43,10 +46,39 @@ class Catalogs(BaseModel):
         assert isinstance(v, dict), "vendor_items must be a mapping"
         return v
 
+    # Lookup tables built on first use; catalogs are not mutated after loading.
+    @cached_property
+    def vendors_by_name(self) -> Dict[str, Vendor]:
+        return {v.name.lower(): v for v in self.vendors}
+
+    @cached_property
+    def vendor_names(self) -> tuple[str, ...]:
+        return tuple(v.name for v in self.vendors)
+
+    @cached_property
+    def vendor_ids_by_name(self) -> Dict[str, str]:
+        return {v.name: v.id for v in self.vendors}
+
+    @cached_property
+    def items_by_code(self) -> Dict[str, Item]:
+        return {i.code: i for i in self.items}
+
+    @cached_property
+    def account_codes(self) -> frozenset[str]:
+        return frozenset(a.code for a in self.accounts)
+
+    @cached_property
+    def tax_code_set(self) -> frozenset[str]:
+        return frozenset(t.code for t in self.tax_codes)
+
 def load_yaml(path: Path) -> Any:
     with open(path, "r", encoding="utf-8") as f:
         return yaml.safe_load(f)
 
+def catalogs_mtime_ns(base_dir: str) -> int:
+    """Latest modification time of the catalog YAML files."""
+    return yaml_mtime_ns(Path(base_dir) / "catalogs")
+
 def load_catalogs(base_dir: str) -> Catalogs:
     base = Path(base_dir) / "catalogs"
     vendors = load_yaml(base / "vendors.yaml")["vendors"]
@@ -89,8 +89,12 @@ def list_backups(base_dir: str = None) -> list[dict]:
     backup_dir = create_backup_dir(base_dir)
     
     backups = []
-    for backup_path in sorted(backup_dir.iterdir(), reverse=True):
-        if backup_path.is_dir():
+    # DirEntry.is_dir answers from the directory listing, without a stat per entry
+    with os.scandir(backup_dir) as it:
+        entries = sorted(it, key=lambda e: e.name, reverse=True)
+    for entry in entries:
+        if entry.is_dir():
+            backup_path = Path(entry.path)
             try:
                 name = backup_path.name
                 
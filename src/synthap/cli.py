@@ -1,22 +1,25 @@
 from __future__ import annotations
 
-import asyncio
-import json
 import random
 import secrets
 from datetime import date
 from pathlib import Path
 from typing import Optional
 
-import pandas as pd
+import orjson
 import typer
 from slugify import slugify
-from tenacity import RetryError
 
 from .catalogs.loader import load_catalogs
 from .config.runtime_config import load_runtime_config
 from .config.settings import settings
-from .data.storage import to_rows, write_parquet
+from .data.storage import (
+    STAGED_INVOICE_COLUMNS,
+    STAGED_LINE_COLUMNS,
+    read_parquet,
+    to_rows,
+    write_parquet,
+)
 
 # AI planner + generator
 from .engine.generator import generate_from_plan
@@ -28,8 +31,15 @@ from .nlp.parser import parse_nlp_to_query
 from .reports.report import write_json
 
 # Xero (OAuth + client)
-from .xero.client import post_invoices, post_payments, resolve_tenant_id, debug_token
-from .xero.mapper import map_invoice
+from .xero.client import (
+    debug_token,
+    post_invoices,
+    post_invoices_batched,
+    post_payments,
+    resolve_tenant_id,
+    run_with_client,
+)
+from .xero.mapper import map_invoice, map_staged_invoices, vendor_ids_by_reference
 from .xero.oauth import TokenStore, check_scopes, build_authorize_url
 
 from .paths import latest_run_id
@@ -68,7 +78,7 @@ def xero_status():
         except Exception as e:
             typer.echo(f"Failed to resolve tenantId: {e}")
 
-    asyncio.run(_show())
+    run_with_client(_show())
 
 
 @app.command("auth-init")
@@ -221,7 +231,7 @@ def generate(
     write_parquet(inv_df, base / "invoices.parquet")
     write_parquet(line_df, base / "invoice_lines.parquet")
 
-    write_json(plan.model_dump(mode="json"), base / "plan.json")
+    write_json(plan.model_dump(mode="json"), base / "plan.json", indent=True)
 
     xero_payload = {"Invoices": [map_invoice(inv) for inv in invoices]}
     write_json(xero_payload, base / "xero_invoices.json")
@@ -314,38 +324,12 @@ def insert(
         typer.echo(f"Missing parquet files in {base}.")
         raise typer.Exit(code=1)
 
-    inv_df = pd.read_parquet(inv_path)
-    line_df = pd.read_parquet(line_path)
+    inv_df = read_parquet(inv_path, STAGED_INVOICE_COLUMNS)
+    line_df = read_parquet(line_path, STAGED_LINE_COLUMNS)
     cfg = load_runtime_config(settings.data_dir)
 
-    payloads = []
-    for ref, lines in line_df.groupby("reference"):
-        head = inv_df[inv_df["reference"] == ref].iloc[0]
-        line_items = []
-        for _, ln in lines.iterrows():
-            line_items.append(
-                {
-                    "Description": ln["description"],
-                    "Quantity": float(ln["quantity"]),
-                    "UnitAmount": float(ln["unit_amount"]),
-                    "AccountCode": str(ln["account_code"]),
-                    "TaxType": str(ln["tax_type"]),
-                    "LineAmount": float(ln["line_amount"]),
-                }
-            )
-        payloads.append(
-            {
-                "Type": "ACCPAY",
-                "Contact": {"ContactID": head["contact_id"]},
-                "CurrencyCode": head["currency"],
-                "LineItems": line_items,
-                "Date": head["date"],
-                "DueDate": head["due_date"],
-                "Reference": ref,
-                "InvoiceNumber": head.get("invoice_number", ref),
-                "Status": head["status"],
-            }
-        )
+    payloads = map_staged_invoices(inv_df, line_df)
+    vendor_by_ref = vendor_ids_by_reference(inv_df)
     # Optional: filter selection
     if reference:
         payloads = [p for p in payloads if p.get("Reference") == reference]
@@ -354,56 +338,43 @@ def insert(
 
 
     async def _insert():
-        batch_size = 50
         total_ok, total_fail = 0, 0
         invoice_records = []
         xero_log: list[dict[str, object]] = []
 
-        for i in range(0, len(payloads), batch_size):
-            batch = payloads[i : i + batch_size]
-            try:
-                resp = await post_invoices(batch)
-                xero_log.append({"action": "post_invoices", "request": batch, "response": resp})
-                batch_invoices = resp.get("Invoices", [])
-                total_ok += len(batch_invoices)
-                for inv in batch_invoices:
-                    ref = inv.get("Reference")
-                    if ref is not None:
-                        match = inv_df[inv_df["reference"] == ref]
-                        if not match.empty:
-                            inv["Vendor"] = match.iloc[0].get("vendor_id")
-                    invoice_records.append(inv)
-            except RetryError as e:
+        # Batches are posted concurrently; results are handled in submission order.
+        results = await post_invoices_batched(payloads, post_invoices)
+        for n, (batch, resp) in enumerate(results):
+            if isinstance(resp, BaseException):
                 total_fail += len(batch)
-                err = str(e.last_attempt.exception())
+                err = str(resp)
                 xero_log.append({"action": "post_invoices", "request": batch, "error": err})
-                typer.echo(f"Batch {i//batch_size} failed: {err}")
-            except Exception as e:
-                total_fail += len(batch)
-                err = str(e)
-                xero_log.append({"action": "post_invoices", "request": batch, "error": err})
-                typer.echo(f"Batch {i//batch_size} failed: {err}")
+                typer.echo(f"Batch {n} failed: {err}")
+                continue
+            xero_log.append({"action": "post_invoices", "request": batch, "response": resp})
+            batch_invoices = resp.get("Invoices", [])
+            total_ok += len(batch_invoices)
+            for inv in batch_invoices:
+                ref = inv.get("Reference")
+                if ref in vendor_by_ref:
+                    inv["Vendor"] = vendor_by_ref[ref]
+                invoice_records.append(inv)
 
         # Persist invoice data so payment runs can match references to IDs.
         inv_report_path = base / "invoice_report.json"
         write_json({"run_id": run_id, "invoices": invoice_records}, inv_report_path)
 
-        # Reload invoices from report to ensure IDs are read from disk.
-        try:
-            invoice_records = json.loads(inv_report_path.read_text()).get("invoices", [])
-        except Exception:
-            invoice_records = []
-
         # Load list of references that should be paid
         to_pay_refs: list[str] = []
         to_pay_path = base / "to_pay.json"
         if to_pay_path.exists():
             try:
-                to_pay_refs = json.loads(to_pay_path.read_text()).get("references", [])
+                to_pay_refs = orjson.loads(to_pay_path.read_bytes()).get("references", [])
             except Exception:
                 pass
 
-        records_to_pay = [r for r in invoice_records if r.get("Reference") in to_pay_refs]
+        to_pay_set = frozenset(to_pay_refs)
+        records_to_pay = [r for r in invoice_records if r.get("Reference") in to_pay_set]
 
         payments = generate_payments(
             records_to_pay,
@@ -419,10 +390,6 @@ def insert(
                 xero_log.append({"action": "post_payments", "request": payments, "response": resp})
                 payment_records = resp.get("Payments", [])
                 typer.echo(f"[{run_id}] Paid {len(payment_records)} invoices.")
-            except RetryError as e:
-                err = str(e.last_attempt.exception())
-                xero_log.append({"action": "post_payments", "request": payments, "error": err})
-                typer.echo(f"Payment batch failed: {err}")
             except Exception as e:
                 err = str(e)
                 xero_log.append({"action": "post_payments", "request": payments, "error": err})
@@ -436,12 +403,12 @@ def insert(
             "inserted_failed": total_fail,
             "payments_made": len(payment_records),
         }
-        write_json(report, base / "insertion_report.json")
+        write_json(report, base / "insertion_report.json", indent=True)
         write_json({"run_id": run_id, "payments": payment_records}, base / "payment_report.json")
         write_json({"run_id": run_id, "events": xero_log}, base / "xero_log.json")
         typer.echo(f"[{run_id}] Inserted: {total_ok}, Failed: {total_fail}. Report saved.")
 
-    asyncio.run(_insert())
+    run_with_client(_insert())
 
 
 @app.command("generate-synthetic-data")
@@ -508,7 +475,7 @@ def generate_synthetic_data(
             typer.echo(f"Error generating synthetic data: {str(e)}")
             raise
     
-    asyncio.run(_run())
+    run_with_client(_run())
 
 
 def runs_dir() -> Path:
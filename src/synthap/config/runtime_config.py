@@ -7,6 +7,7 @@ import yaml
 from pydantic import BaseModel, Field
 
 from .settings import settings
+from ..paths import yaml_mtime_ns
 
 
 class AIConfig(BaseModel):
@@ -82,6 +83,11 @@ def _deep_merge(a: dict[str, Any], b: dict[str, Any]) -> dict[str, Any]:
     return out
 
 
+def runtime_config_mtime_ns(base_dir: str) -> int:
+    """Latest modification time of the runtime config YAML files."""
+    return yaml_mtime_ns(Path(base_dir) / "config")
+
+
 def load_runtime_config(base_dir: str) -> RuntimeConfig:
     defaults = _load_yaml(_defaults_path(base_dir))
     runtime = _load_yaml(_runtime_path(base_dir))
@@ -1,8 +1,22 @@
 from pathlib import Path
 import pandas as pd
-from typing import List
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+from typing import List, Optional, Sequence
 from ..engine.generator import Invoice
 
+# Columns the Xero insert path reads back from a run's staged parquet files.
+STAGED_INVOICE_COLUMNS = (
+    "reference", "contact_id", "currency", "date", "due_date",
+    "status", "invoice_number", "vendor_id",
+)
+STAGED_LINE_COLUMNS = (
+    "reference", "description", "quantity", "unit_amount",
+    "account_code", "tax_type", "line_amount",
+)
+
 def to_rows(invoices: List[Invoice]) -> tuple[pd.DataFrame, pd.DataFrame]:
     inv_rows, line_rows = [], []
     for inv in invoices:
@@ -29,6 +43,48 @@ def to_rows(invoices: List[Invoice]) -> tuple[pd.DataFrame, pd.DataFrame]:
             })
     return pd.DataFrame(inv_rows), pd.DataFrame(line_rows)
 
+def _ipc_sidecar(path: Path) -> Path:
+    """Uncompressed Arrow IPC copy of a staged parquet file."""
+    return path.with_suffix(".arrow")
+
 def write_parquet(df: pd.DataFrame, path: Path) -> None:
+    """Write ``df`` with zstd and dictionary encoding.
+
+    Staged runs repeat the same references, tax types, account codes and
+    statuses on every row, which dictionary pages store once. An Arrow IPC
+    sidecar is written alongside for :func:`read_parquet` to memory-map.
+    """
     path.parent.mkdir(parents=True, exist_ok=True)
-    df.to_parquet(path, index=False)
+    tbl = pa.Table.from_pandas(df, preserve_index=False)
+    pq.write_table(
+        tbl,
+        path,
+        compression="zstd",
+        compression_level=1,
+        use_dictionary=True,
+        data_page_size=256 * 1024,
+        write_statistics=True,
+    )
+    feather.write_feather(tbl, _ipc_sidecar(path), compression="uncompressed")
+
+def read_parquet(path: Path, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """Read ``path``, decoding only those of ``columns`` present in the file.
+
+    The Arrow IPC sidecar is memory-mapped instead when it is at least as new
+    as the parquet file, which skips parquet decoding entirely.
+    """
+    sidecar = _ipc_sidecar(path)
+    try:
+        fresh = sidecar.stat().st_mtime_ns >= path.stat().st_mtime_ns
+    except FileNotFoundError:
+        fresh = False
+    if fresh:
+        with pa.memory_map(str(sidecar)) as source:
+            tbl = ipc.open_file(source).read_all()
+        if columns is not None:
+            tbl = tbl.select([c for c in columns if c in tbl.column_names])
+        return tbl.to_pandas(self_destruct=True)
+    if columns is not None:
+        names = set(pq.read_schema(path).names)
+        columns = [c for c in columns if c in names]
+    return pq.read_table(path, columns=columns, use_threads=True).to_pandas(self_destruct=True)
@@ -17,7 +17,7 @@ from .planner import business_days, calc_due_date
 Money = Decimal
 
 
-@dataclass
+@dataclass(slots=True)
 class InvoiceLine:
     description: str
     quantity: Decimal
@@ -28,7 +28,7 @@ class InvoiceLine:
     item_code: str
 
 
-@dataclass
+@dataclass(slots=True)
 class Invoice:
     vendor_id: str
     contact_id: str
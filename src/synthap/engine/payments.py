@@ -1,9 +1,73 @@
 from __future__ import annotations
 
-from datetime import date, datetime, timedelta
+from datetime import date, datetime, timedelta, timezone
 import random
+import re
 from typing import List, Dict, Any, Optional
 
+import numpy as np
+
+
+_XERO_MS_RE = re.compile(r"/Date\((-?\d+)")
+
+
+def _parse_xero_date(value: Optional[str]) -> Optional[date]:
+    """Parse an ISO date or Xero's legacy ``/Date(ms+0000)/`` form."""
+    if not value:
+        return None
+    if value[0] == "/":
+        m = _XERO_MS_RE.match(value)
+        if not m:
+            return None
+        return datetime.fromtimestamp(int(m.group(1)) / 1000, tz=timezone.utc).date()
+    # Xero's DateString is ``YYYY-MM-DDTHH:MM:SS``; the date prefix parses
+    # without building a datetime. Other ISO forms take the slower path.
+    try:
+        return date.fromisoformat(value[:10])
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(value).date()
+    except ValueError:
+        return None
+
+
+def _record_dates(rec: Dict[str, Any]) -> tuple[date, date]:
+    """Return the invoice and due dates of a Xero invoice record."""
+    inv_date = _parse_xero_date(rec.get("DateString")) or date.today()
+    due_date = _parse_xero_date(rec.get("DueDateString")) or inv_date
+    return inv_date, due_date
+
+
+def _overdue_window(rec: Dict[str, Any]) -> tuple[date, int]:
+    """Pay between 1 and 30 days after the due date."""
+    _, due_date = _record_dates(rec)
+    return due_date + timedelta(days=1), 29
+
+
+def _before_due_window(rec: Dict[str, Any]) -> tuple[date, int]:
+    """Pay between the invoice date and the day before it falls due."""
+    inv_date, due_date = _record_dates(rec)
+    return inv_date, max((due_date - inv_date).days - 1, 0)
+
+
+def _random_offsets(spans: np.ndarray) -> np.ndarray:
+    """Draw a uniform offset in ``[0, span]`` for every span in one batch.
+
+    The generator is seeded from :mod:`random` so ``random.seed`` still
+    controls payment dates.
+    """
+    rng = np.random.default_rng(random.getrandbits(64))
+    return rng.integers(0, spans + 1)
+
+
+def _amount_due(rec: Dict[str, Any]) -> Any:
+    """Outstanding amount of a record; a zero AmountDue means it is settled."""
+    amount = rec.get("AmountDue")
+    if amount is None:
+        amount = rec.get("Total")
+    return amount
+
 
 def generate_payments(
     invoice_records: List[Dict[str, Any]],
@@ -21,52 +85,40 @@ def generate_payments(
         return []
     if account_code is None:
         account_code = "101"
+    # Shared by every payload; callers only serialise payments, never mutate them.
+    account = {"Code": account_code}
+
+    payable = [
+        (inv_id, amount, rec)
+        for rec in invoice_records
+        if (inv_id := rec.get("InvoiceID")) and (amount := _amount_due(rec))
+    ]
+    if not payable:
+        return []
 
-    payments: List[Dict[str, Any]] = []
-    for rec in invoice_records:
-        inv_id = rec.get("InvoiceID")
-        amount = rec.get("AmountDue") or rec.get("Total")
-        if not inv_id or amount is None:
-            continue
-
-        if payment_date is not None:
-            pay_date = payment_date
-        else:
-            date_str = rec.get("DateString")
-            due_str = rec.get("DueDateString")
-            try:
-                inv_date = datetime.fromisoformat(date_str).date() if date_str else date.today()
-            except Exception:
-                inv_date = date.today()
-            try:
-                due_date = datetime.fromisoformat(due_str).date() if due_str else inv_date
-            except Exception:
-                due_date = inv_date
-            if pay_on_due_date:
-                pay_date = due_date
-            else:
-                if allow_overdue:
-                    start = due_date + timedelta(days=1)
-                    end = due_date + timedelta(days=30)
-                    delta = (end - start).days
-                    offset = random.randint(0, delta) if delta > 0 else 0
-                    pay_date = start + timedelta(days=offset)
-                else:
-                    end = due_date - timedelta(days=1)
-                    if end < inv_date:
-                        end = inv_date
-                    delta = (end - inv_date).days
-                    offset = random.randint(0, delta) if delta > 0 else 0
-                    pay_date = inv_date + timedelta(days=offset)
-        payments.append(
-            {
-                "Invoice": {"InvoiceID": inv_id, "LineItems": []},
-                "Account": {"Code": account_code},
-                "Date": pay_date.isoformat(),
-                "Amount": amount,
-            }
-        )
-    return payments
+    # The payment-date strategy is fixed for the whole batch, so pick it once.
+    if payment_date is not None:
+        pay_isos = [payment_date.isoformat()] * len(payable)
+    elif pay_on_due_date:
+        pay_isos = [_record_dates(rec)[1].isoformat() for _, _, rec in payable]
+    else:
+        window = _overdue_window if allow_overdue else _before_due_window
+        starts, spans = zip(*(window(rec) for _, _, rec in payable))
+        offsets = _random_offsets(np.asarray(spans))
+        pay_isos = [
+            (start + timedelta(days=int(offset))).isoformat()
+            for start, offset in zip(starts, offsets)
+        ]
+
+    return [
+        {
+            "Invoice": {"InvoiceID": inv_id, "LineItems": []},
+            "Account": account,
+            "Date": pay_iso,
+            "Amount": amount,
+        }
+        for (inv_id, amount, _), pay_iso in zip(payable, pay_isos)
+    ]
 
 
 def select_invoices_to_pay(
@@ -83,6 +135,8 @@ def select_invoices_to_pay(
     is supplied (``pay_count`` is ``None`` and ``pay_all`` is False), invoices
     are only paid when ``pay_when_unspecified`` is True, in which case a random
     subset is chosen. Otherwise, no invoices are marked for payment.
+
+    Sampling is driven by ``rng`` so the selection is reproducible per seed.
     """
 
     if not all_refs:
@@ -100,4 +154,6 @@ def select_invoices_to_pay(
     if pay_count == 0:
         return []
 
-    return rng.sample(all_refs, pay_count)
+    np_rng = np.random.default_rng(rng.getrandbits(64))
+    idx = np_rng.choice(len(all_refs), size=pay_count, replace=False)
+    return [all_refs[i] for i in idx]
@@ -1,29 +1,36 @@
 from datetime import date, timedelta
+from functools import lru_cache
 from typing import List
+
+import numpy as np
+from dateutil.relativedelta import relativedelta
+
 from ..catalogs.loader import Vendor
 
 def business_days(start: date, end: date) -> List[date]:
-    d = start
-    out = []
-    while d <= end:
-        if d.weekday() < 5:
-            out.append(d)
-        d += timedelta(days=1)
-    return out
+    days = np.arange(np.datetime64(start, "D"), np.datetime64(end, "D") + 1, dtype="datetime64[D]")
+    return days[np.is_busday(days)].tolist()
 
-def calc_due_date(issue: date, vendor: Vendor) -> date:
-    t = vendor.payment_terms
-    t_type = t.get("type", "DAYSAFTERBILLDATE").upper()
+@lru_cache(maxsize=4096)
+def _due_date(issue: date, t_type: str, n: int) -> date:
     if t_type == "DAYSAFTERBILLDATE":
-        days = int(t.get("days", 30))
-        return issue + timedelta(days=days)
+        return issue + timedelta(days=n)
     if t_type == "OFFOLLOWINGMONTH":
-        dom = int(t.get("day_of_month", 31))
         y = issue.year + (1 if issue.month == 12 else 0)
         m = 1 if issue.month == 12 else issue.month + 1
-        from dateutil.relativedelta import relativedelta
         start_next = date(y, m, 1)
         last_next = start_next + relativedelta(months=1) - timedelta(days=1)
-        day = min(dom, last_next.day)
+        day = min(n, last_next.day)
         return date(y, m, day)
     return issue + timedelta(days=30)
+
+def calc_due_date(issue: date, vendor: Vendor) -> date:
+    t = vendor.payment_terms
+    t_type = t.get("type", "DAYSAFTERBILLDATE").upper()
+    if t_type == "DAYSAFTERBILLDATE":
+        n = int(t.get("days", 30))
+    elif t_type == "OFFOLLOWINGMONTH":
+        n = int(t.get("day_of_month", 31))
+    else:
+        n = 0
+    return _due_date(issue, t_type, n)
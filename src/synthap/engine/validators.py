@@ -3,9 +3,9 @@ from ..catalogs.loader import Catalogs
 from .generator import Invoice
 
 def validate_invoices(cat: Catalogs, invoices: List[Invoice]) -> None:
-    acct = {a.code for a in cat.accounts}
-    tax = {t.code for t in cat.tax_codes}
-    vendors = {v.xero_contact_id for v in cat.vendors}
+    acct = frozenset(a.code for a in cat.accounts)
+    tax = frozenset(t.code for t in cat.tax_codes)
+    vendors = frozenset(v.xero_contact_id for v in cat.vendors)
     for idx, inv in enumerate(invoices):
         if inv.contact_id not in vendors:
             raise ValueError(f"Invoice {idx}: unknown contact_id {inv.contact_id}")
@@ -18,6 +18,8 @@ def validate_invoices(cat: Catalogs, invoices: List[Invoice]) -> None:
                 raise ValueError(f"Invoice {idx} line {j}: invalid account {ln.account_code}")
             if ln.tax_type not in tax:
                 raise ValueError(f"Invoice {idx} line {j}: invalid tax code {ln.tax_type}")
-            calc = (ln.quantity * ln.unit_amount)
-            if ln.line_amount != calc.quantize(ln.line_amount):
+            calc = ln.quantity * ln.unit_amount
+            # Whole quantities times 2dp prices are exact, so the quantize is
+            # only needed when the plain comparison disagrees.
+            if calc != ln.line_amount and ln.line_amount != calc.quantize(ln.line_amount):
                 raise ValueError(f"Invoice {idx} line {j}: line_amount mismatch.")
@@ -1,10 +1,14 @@
 """Logging utilities for the application."""
 
 from __future__ import annotations
+import atexit
 import json
 import logging
+import queue
+import re
+import threading
 from datetime import datetime
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 import os
 from pathlib import Path
 import traceback
@@ -15,6 +19,19 @@ import pandas as pd
 from .config.settings import settings
 
 
+# Expected format: '2025-09-10 12:34:56,789 - INFO - message'
+# or '2025-09-10 12:34:56,789 - INFO - module_name - message' for root logger
+LOG_LINE_RE = re.compile(r"^(\S+ \S+) - ([A-Z]+) - (?:[\w.]+ - )?(.*)$")
+
+# Level names accepted by log_system/log_xero; anything else is ignored.
+_LEVELS = {
+    "DEBUG": logging.DEBUG,
+    "INFO": logging.INFO,
+    "WARNING": logging.WARNING,
+    "ERROR": logging.ERROR,
+}
+
+
 def logs_dir() -> Path:
     """Get the logs directory path."""
     base_dir = settings.runs_dir if settings.runs_dir else "runs"
@@ -23,15 +40,39 @@ def logs_dir() -> Path:
     return log_dir
 
 
+def _tail_lines(path: Path, n: int, block_size: int = 8192) -> List[str]:
+    """Return the last ``n`` lines of ``path`` by reading blocks from the end."""
+    if n <= 0:
+        return []
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        chunks: List[bytes] = []
+        newlines = 0
+        # One extra newline guarantees the first kept line is complete.
+        while pos > 0 and newlines <= n:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            chunk = f.read(step)
+            chunks.append(chunk)
+            newlines += chunk.count(b"\n")
+    data = b"".join(reversed(chunks)).decode("utf-8", errors="replace")
+    return data.splitlines(keepends=True)[-n:]
+
+
 class LogManager:
     """Manager for application logs."""
     _instance = None
+    _instance_lock = threading.Lock()
     
     @classmethod
     def get_instance(cls) -> LogManager:
         """Get or create the singleton instance."""
         if cls._instance is None:
-            cls._instance = LogManager()
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = LogManager()
         return cls._instance
     
     def __init__(self):
@@ -40,8 +81,16 @@ class LogManager:
         self._setup_loggers()
     
     def _setup_loggers(self):
-        """Set up the different loggers."""
+        """Set up the different loggers.
+
+        Loggers only enqueue records; a single background listener owns the
+        rotating file handlers so file I/O and rotation stay off the caller.
+        Each file handler filters on logger name because the queue is shared.
+        """
         log_dir = logs_dir()
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        queue_handler = QueueHandler(log_queue)
+        file_handlers = []
         
         # Configure root logger to capture all module-level logging
         root_logger = logging.getLogger()
@@ -53,7 +102,11 @@ class LogManager:
             )
             root_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(name)s - %(message)s')
             root_handler.setFormatter(root_formatter)
-            root_logger.addHandler(root_handler)
+            root_handler.addFilter(
+                lambda record: record.name.partition(".")[0] not in self.loggers
+            )
+            file_handlers.append(root_handler)
+            root_logger.addHandler(queue_handler)
             root_logger.setLevel(logging.INFO)
         
         # System logger for application-specific logging
@@ -67,7 +120,9 @@ class LogManager:
         )
         system_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
         system_handler.setFormatter(system_formatter)
-        system_logger.addHandler(system_handler)
+        system_handler.addFilter(logging.Filter("system"))
+        file_handlers.append(system_handler)
+        system_logger.addHandler(queue_handler)
         self.loggers["system"] = system_logger
         
         # Xero logger
@@ -81,7 +136,9 @@ class LogManager:
         )
         xero_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
         xero_handler.setFormatter(xero_formatter)
-        xero_logger.addHandler(xero_handler)
+        xero_handler.addFilter(logging.Filter("xero"))
+        file_handlers.append(xero_handler)
+        xero_logger.addHandler(queue_handler)
         self.loggers["xero"] = xero_logger
         
         # Error logger
@@ -95,39 +152,37 @@ class LogManager:
         )
         error_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s\n%(pathname)s:%(lineno)d')
         error_handler.setFormatter(error_formatter)
-        error_logger.addHandler(error_handler)
+        error_handler.addFilter(logging.Filter("error"))
+        file_handlers.append(error_handler)
+        error_logger.addHandler(queue_handler)
         self.loggers["error"] = error_logger
+
+        self._listener = QueueListener(log_queue, *file_handlers, respect_handler_level=True)
+        self._listener.start()
+        atexit.register(self._listener.stop)
     
+    def _log(self, name: str, message: str, level: str) -> None:
+        """Log ``message`` to ``name``; errors are mirrored to the error log."""
+        lvl = _LEVELS.get(level)
+        if lvl is None:
+            return
+        self.loggers[name].log(lvl, message)
+        if lvl == logging.ERROR:
+            self.loggers["error"].error(f"{name.upper()}: {message}")
+
     def log_system(self, message: str, level: str = "INFO"):
         """Log a system message."""
-        if level == "INFO":
-            self.loggers["system"].info(message)
-        elif level == "WARNING":
-            self.loggers["system"].warning(message)
-        elif level == "ERROR":
-            self.loggers["system"].error(message)
-            # Also log to error logger
-            self.loggers["error"].error(f"SYSTEM: {message}")
-        elif level == "DEBUG":
-            self.loggers["system"].debug(message)
+        self._log("system", message, level)
     
     def log_xero(self, message: str, level: str = "INFO"):
         """Log a Xero API related message."""
-        if level == "INFO":
-            self.loggers["xero"].info(message)
-        elif level == "WARNING":
-            self.loggers["xero"].warning(message)
-        elif level == "ERROR":
-            self.loggers["xero"].error(message)
-            # Also log to error logger
-            self.loggers["error"].error(f"XERO: {message}")
-        elif level == "DEBUG":
-            self.loggers["xero"].debug(message)
+        self._log("xero", message, level)
     
     def log_error(self, message: str, exception=None):
         """Log an error with optional exception details."""
         if exception:
-            tb = traceback.format_exc()
+            # Format the given exception so this also works outside an except block
+            tb = "".join(traceback.format_exception(exception))
             self.loggers["error"].error(f"{message}\n{tb}")
         else:
             self.loggers["error"].error(message)
@@ -141,48 +196,36 @@ class LogManager:
             return []
         
         try:
-            with open(log_file, "r", encoding="utf-8") as f:
-                lines = f.readlines()
-            
             # Get the last N lines (most recent logs first)
-            lines = lines[-max_lines:]
+            lines = _tail_lines(log_file, max_lines)
             
+            search_re = re.compile(re.escape(search_text), re.IGNORECASE) if search_text else None
+
             # Process lines into structured format for display
             processed_logs = []
+            kept = True
             for line in lines:
-                try:
-                    # Parse the log line 
-                    # Expected format: '2025-09-10 12:34:56,789 - INFO - message'
-                    # or '2025-09-10 12:34:56,789 - INFO - module_name - message' for root logger
-                    parts = line.split(" - ", 3)
-                    if len(parts) >= 3:
-                        timestamp = parts[0]
-                        level = parts[1]
-                        message = parts[-1]  # Last part is always the message
-                        
-                        # Apply filters
-                        if search_text and search_text.lower() not in line.lower():
-                            continue
-                            
-                        if level_filter and level.strip() != level_filter:
-                            continue
-                            
-                        processed_logs.append({
-                            "timestamp": timestamp.strip(),
-                            "level": level.strip(),
-                            "message": message.strip()
-                        })
-                    else:
-                        # If it's a continuation line, append to the last message
-                        if processed_logs:
-                            processed_logs[-1]["message"] += "\n" + line.strip()
-                except Exception:
-                    # If parsing fails, just add the raw line
-                    processed_logs.append({
-                        "timestamp": "",
-                        "level": "PARSE_ERROR",
-                        "message": line.strip()
-                    })
+                m = LOG_LINE_RE.match(line)
+                if m is None:
+                    # If it's a continuation line, append to the last message
+                    if kept and processed_logs:
+                        processed_logs[-1]["message"] += "\n" + line.strip()
+                    continue
+
+                timestamp, level, message = m.groups()
+
+                # Apply filters; continuation lines follow their entry's verdict
+                kept = (not level_filter or level == level_filter) and (
+                    search_re is None or search_re.search(line) is not None
+                )
+                if not kept:
+                    continue
+
+                processed_logs.append({
+                    "timestamp": timestamp,
+                    "level": level,
+                    "message": message.strip()
+                })
             
             # Reverse to show newest at the top
             return list(reversed(processed_logs))
@@ -195,13 +238,9 @@ class LogManager:
             }]
 
 
-# Initialize the log manager
-_log_manager = LogManager()
-
-
 def get_log_manager() -> LogManager:
-    """Get the log manager instance."""
-    return _log_manager
+    """Get the log manager instance, creating it on first use."""
+    return LogManager.get_instance()
 
 
 # Helper functions for easy logging
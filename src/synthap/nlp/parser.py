@@ -3,6 +3,7 @@ import json
 import re
 from dataclasses import dataclass
 from datetime import date
+from functools import lru_cache
 from typing import Optional
 
 from .periods import resolve_period_au  # AU fiscal / common phrases
@@ -30,38 +31,45 @@ class ParsedQuery:
     pay_count: Optional[int] = None
     pay_all: bool = False
 
-COUNT_PATTERNS = [
-    r"\bgenerate\s+(\d+(?:\.\d+)?)\b",
-    r"\bneed\s+(\d+(?:\.\d+)?)\b",
-    r"\b(\d+(?:\.\d+)?)\s+(?:bills|invoices)\b",
-]
-
-VENDOR_PATTERNS = [
-    r"\bfor\s+vendor\s+([A-Za-z0-9 _\-\&\.]+)\b",
-    r"\bfor\s+([A-Za-z0-9 _\-\&\.]+)\s+bills?\b",
-]
-
-LINE_RANGE_PATTERNS = [
-    r"\bwith\s+(\d+)\s*-\s*(\d+)\s+line\s+items?\b",
-    r"\bwith\s+between\s+(\d+)\s+and\s+(\d+)\s+lines?\b",
-    r"\bwith\s+(\d+)\s+to\s+(\d+)\s+line\s+items?\b",
-    r"\bwith\s+(\d+)\s+line\s+items?\b",  # exact count fallback
-]
-
-PAY_COUNT_PATTERNS = [
-    r"pay for only (\d+(?:\.\d+)?)",
-    r"pay only (\d+(?:\.\d+)?)",
-    r"pay for (\d+(?:\.\d+)?) bills?",
-    r"pay (\d+(?:\.\d+)?) bills?",
-    r"pay for (\d+(?:\.\d+)?)",
-    r"pay (\d+(?:\.\d+)?)",
-]
-
-PAY_ALL_PATTERNS = [
-    r"pay for all",
-    r"pay all",
-    r"pay every(thing| bill)",
-]
+# Each extractor is a single alternation so one scan of the query covers every
+# phrasing. Alternatives are listed in priority order: when several match at the
+# same position the first listed wins, otherwise the leftmost match wins.
+COUNT_RE = re.compile(
+    r"\bgenerate\s+(?P<c1>\d+(?:\.\d+)?)\b"
+    r"|\bneed\s+(?P<c2>\d+(?:\.\d+)?)\b"
+    r"|\b(?P<c3>\d+(?:\.\d+)?)\s+(?:bills|invoices)\b",
+    re.IGNORECASE,
+)
+
+# Bounded so a failed "bills" match backtracks at most a name's length from each
+# "for", keeping long queries linear instead of quadratic in the text length.
+_VENDOR_NAME = r"[A-Za-z0-9 _\-\&\.]{1,200}"
+
+VENDOR_RE = re.compile(
+    rf"\bfor\s+vendor\s+(?P<v1>{_VENDOR_NAME})\b"
+    rf"|\bfor\s+(?P<v2>{_VENDOR_NAME})\s+bills?\b",
+    re.IGNORECASE,
+)
+
+LINE_RANGE_RE = re.compile(
+    r"\bwith\s+(?P<lo1>\d+)\s*-\s*(?P<hi1>\d+)\s+line\s+items?\b"
+    r"|\bwith\s+between\s+(?P<lo2>\d+)\s+and\s+(?P<hi2>\d+)\s+lines?\b"
+    r"|\bwith\s+(?P<lo3>\d+)\s+to\s+(?P<hi3>\d+)\s+line\s+items?\b"
+    r"|\bwith\s+(?P<n>\d+)\s+line\s+items?\b",  # exact count fallback
+    re.IGNORECASE,
+)
+
+PAY_COUNT_RE = re.compile(
+    r"pay for only (?P<p1>\d+(?:\.\d+)?)"
+    r"|pay only (?P<p2>\d+(?:\.\d+)?)"
+    r"|pay for (?P<p3>\d+(?:\.\d+)?) bills?"
+    r"|pay (?P<p4>\d+(?:\.\d+)?) bills?"
+    r"|pay for (?P<p5>\d+(?:\.\d+)?)"
+    r"|pay (?P<p6>\d+(?:\.\d+)?)",
+    re.IGNORECASE,
+)
+
+PAY_ALL_RE = re.compile(r"pay for all|pay all|pay every(?:thing| bill)", re.IGNORECASE)
 
 
 def _ensure_int(value: Optional[object]) -> Optional[int]:
@@ -83,11 +91,26 @@ def _ensure_int(value: Optional[object]) -> Optional[int]:
     raise ValueError(f"Invalid number '{value}'")
 
 
-def _parse_with_llm(text: str, api_key: str) -> dict:
-    """Use an LLM to extract structured fields from the query."""
+@lru_cache(maxsize=4)
+def _get_openai_client(api_key: str):
+    """Return a reusable OpenAI client for ``api_key``.
+
+    A short timeout lets a stalled request fall back to regex parsing quickly
+    instead of waiting out the SDK's 10 minute default.
+    """
+    import httpx
     from openai import OpenAI
 
-    client = OpenAI(api_key=api_key)
+    http_client = httpx.Client(
+        timeout=httpx.Timeout(20.0, connect=5.0),
+        limits=httpx.Limits(max_keepalive_connections=4, max_connections=8),
+    )
+    return OpenAI(api_key=api_key, http_client=http_client)
+
+
+def _parse_with_llm(text: str, api_key: str) -> dict:
+    """Use an LLM to extract structured fields from the query."""
+    client = _get_openai_client(api_key)
     system = (
         "You parse accounts payable generation requests and extract"\
         " fields. Return JSON with keys: total_count, vendor_name,"\
@@ -105,43 +128,41 @@ def _parse_with_llm(text: str, api_key: str) -> dict:
     )
     return json.loads(resp.choices[0].message.content)
 
-def _extract_int(patterns: list[str], text: str) -> Optional[int]:
-    for p in patterns:
-        m = re.search(p, text, flags=re.IGNORECASE)
-        if m:
-            s = m.group(1)
-            if "." in s:
-                raise ValueError(f"Invalid non-integer number '{s}'")
-            try:
-                return int(s)
-            except ValueError:
-                raise ValueError(f"Invalid number '{s}'")
-    return None
+def _extract_int(pattern: re.Pattern[str], text: str) -> Optional[int]:
+    m = pattern.search(text)
+    if not m:
+        return None
+    s = m.group(m.lastgroup)
+    if "." in s:
+        raise ValueError(f"Invalid non-integer number '{s}'")
+    try:
+        return int(s)
+    except ValueError:
+        raise ValueError(f"Invalid number '{s}'")
 
 def _extract_vendor(text: str) -> Optional[str]:
-    for p in VENDOR_PATTERNS:
-        m = re.search(p, text, flags=re.IGNORECASE)
-        if m:
-            return m.group(1).strip()
+    m = VENDOR_RE.search(text)
+    if m:
+        return m.group(m.lastgroup).strip()
     return None
 
 def _extract_line_range(text: str) -> tuple[Optional[int], Optional[int]]:
-    for p in LINE_RANGE_PATTERNS:
-        m = re.search(p, text, flags=re.IGNORECASE)
-        if m:
-            if m.lastindex == 2:
-                a, b = int(m.group(1)), int(m.group(2))
-                if a > b:
-                    a, b = b, a
-                return a, b
-            elif m.lastindex == 1:
-                n = int(m.group(1))
-                return n, n
-    return None, None
+    m = LINE_RANGE_RE.search(text)
+    if not m:
+        return None, None
+    if m.group("n") is not None:
+        n = int(m.group("n"))
+        return n, n
+    g = m.groupdict()
+    a = int(g["lo1"] or g["lo2"] or g["lo3"])
+    b = int(g["hi1"] or g["hi2"] or g["hi3"])
+    if a > b:
+        a, b = b, a
+    return a, b
 
 def _extract_pay_info(text: str) -> tuple[Optional[int], bool]:
-    count = _extract_int(PAY_COUNT_PATTERNS, text)
-    all_flag = any(re.search(p, text, flags=re.IGNORECASE) for p in PAY_ALL_PATTERNS)
+    count = _extract_int(PAY_COUNT_RE, text)
+    all_flag = PAY_ALL_RE.search(text) is not None
     return count, all_flag
 
 def parse_nlp_to_query(
@@ -162,7 +183,7 @@ def parse_nlp_to_query(
 
     count = _ensure_int(llm_data.get("total_count")) if llm_data else None
     if count is None:
-        count = _extract_int(COUNT_PATTERNS, t) or 10
+        count = _extract_int(COUNT_RE, t) or 10
 
     if count <= 0:
         raise ValueError("Bill count must be a positive integer")
@@ -176,8 +197,7 @@ def parse_nlp_to_query(
 
     vendor_id = None
     if catalogs and vendor_name:
-        name_map = {v.name.lower(): v for v in catalogs.vendors}
-        v = name_map.get(vendor_name.lower())
+        v = catalogs.vendors_by_name.get(vendor_name.lower())
         if not v:
             raise QueryScopeError(f"Query out of scope: unknown vendor '{vendor_name}'")
         item_codes = catalogs.vendor_items.get(v.id, [])
@@ -185,9 +205,9 @@ def parse_nlp_to_query(
             raise QueryScopeError(
                 f"Query out of scope: vendor '{vendor_name}' has no items"
             )
-        item_map = {i.code: i for i in catalogs.items}
-        account_codes = {a.code for a in catalogs.accounts}
-        tax_codes = {t.code for t in catalogs.tax_codes}
+        item_map = catalogs.items_by_code
+        account_codes = catalogs.account_codes
+        tax_codes = catalogs.tax_code_set
         for code in item_codes:
             it = item_map.get(code)
             if not it:
@@ -1,6 +1,8 @@
 from __future__ import annotations
 import re
+from calendar import monthrange
 from datetime import date, timedelta
+from functools import lru_cache
 from typing import NamedTuple
 
 class DateRange(NamedTuple):
@@ -29,11 +31,51 @@ def limit_to_current_date(date_range: DateRange, today: date) -> DateRange:
         )
     return date_range
 
+# Every recognised period phrase in one alternation. Groups are listed in
+# priority order: when a query mentions several periods the earliest listed
+# kind wins regardless of where it appears in the text.
+PERIOD_RE = re.compile(
+    r"(?P<this_quarter>current quarter|this quarter)"
+    r"|(?P<this_month>current month|this month)"
+    r"|(?P<abs_quarter>\bq(?P<q_num>[1-4])\s+(?P<q_year>\d{4})\b)"
+    r"|(?P<yesterday>yesterday)"
+    r"|(?P<today>today)"
+    r"|(?P<last_week>last week)"
+    r"|(?P<last_month>last month)"
+    r"|(?P<last_quarter>last quarter)"
+)
+_PERIOD_PRIORITY = {
+    name: rank
+    for rank, name in enumerate(
+        ("this_quarter", "this_month", "abs_quarter", "yesterday",
+         "today", "last_week", "last_month", "last_quarter")
+    )
+}
+
+# Indexed by the current month: (year offset, previous month).
+_LAST_MONTH = (None,) + tuple((-1, 12) if m == 1 else (0, m - 1) for m in range(1, 13))
+
+# Indexed by the current month: (year offset, start month, end month) of the
+# range "last quarter" resolves to.
+_LAST_QUARTER = (
+    None,
+    (0, 10, 12), (0, 10, 12), (0, 10, 12),     # Q3 (Jan-Mar)
+    (0, 1, 3), (0, 1, 3), (0, 1, 3),           # Q4 (Apr-Jun)
+    (-1, 4, 6), (-1, 4, 6), (-1, 4, 6),        # Q1 (Jul-Sep): last Q4 prev FY
+    (0, 7, 9), (0, 7, 9), (0, 7, 9),           # Q2 (Oct-Dec)
+)
+
+
+# Pure in (text, today) and returns an immutable DateRange, so safe to share.
+@lru_cache(maxsize=256)
 def resolve_period_au(text: str, today: date) -> DateRange:
     t = text.lower().strip()
 
-    # Check for "current quarter" or "this quarter"
-    if "current quarter" in t or "this quarter" in t:
+    m = min(PERIOD_RE.finditer(t), key=lambda m: _PERIOD_PRIORITY[m.lastgroup], default=None)
+    kind = m.lastgroup if m else None
+
+    # "current quarter" or "this quarter"
+    if kind == "this_quarter":
         mth = today.month
         if mth in (7, 8, 9):  # Q1
             return DateRange(date(today.year, 7, 1), min(today, date(today.year, 9, 30)))
@@ -44,47 +86,36 @@ def resolve_period_au(text: str, today: date) -> DateRange:
         if mth in (4, 5, 6):  # Q4
             return DateRange(date(today.year, 4, 1), min(today, date(today.year, 6, 30)))
 
-    # Check for "current month" or "this month"
-    if "current month" in t or "this month" in t:
-        from calendar import monthrange
+    # "current month" or "this month"
+    if kind == "this_month":
         return DateRange(date(today.year, today.month, 1), today)
 
     # absolute quarter: Q[1-4] YYYY (AU FY naming: Q1=Jul-Sep of that YYYY)
-    m = re.search(r"\bq([1-4])\s+(\d{4})\b", t)
-    if m:
-        q = int(m.group(1)); y = int(m.group(2))
+    if kind == "abs_quarter":
+        q = int(m.group("q_num")); y = int(m.group("q_year"))
         if q == 1:  return DateRange(date(y,7,1),  date(y,9,30))
         if q == 2:  return DateRange(date(y,10,1), date(y,12,31))
         if q == 3:  return DateRange(date(y+1,1,1), date(y+1,3,31))
         if q == 4:  return DateRange(date(y+1,4,1), date(y+1,6,30))
 
-    if "yesterday" in t:
+    if kind == "yesterday":
         d = today - timedelta(days=1)
         return DateRange(d, d)
-    if "today" in t:
+    if kind == "today":
         return DateRange(today, today)
-    if "last week" in t:
+    if kind == "last_week":
         end = _week_start(today) - timedelta(days=1)
         start = end - timedelta(days=6)
         return DateRange(start, end)
-    if "last month" in t:
-        y = today.year; mth = today.month
-        prev_y = y if mth > 1 else y-1
-        prev_m = mth-1 if mth>1 else 12
-        from calendar import monthrange
+    if kind == "last_month":
+        yd, prev_m = _LAST_MONTH[today.month]
+        prev_y = today.year + yd
         return DateRange(date(prev_y, prev_m, 1), date(prev_y, prev_m, monthrange(prev_y, prev_m)[1]))
-    if "last quarter" in t:
+    if kind == "last_quarter":
         # AU quarters rolling based on today
-        mth = today.month
-        if mth in (7,8,9):     # Q1
-            return DateRange(date(today.year-1,4,1), date(today.year-1,6,30)) # last Q4 prev FY
-        if mth in (10,11,12):  # Q2
-            return DateRange(date(today.year,7,1), date(today.year,9,30))
-        if mth in (1,2,3):     # Q3
-            return DateRange(date(today.year,10,1), date(today.year,12,31))
-        if mth in (4,5,6):     # Q4
-            return DateRange(date(today.year,1,1), date(today.year,3,31))
+        yd, sm, em = _LAST_QUARTER[today.month]
+        y = today.year + yd
+        return DateRange(date(y, sm, 1), date(y, em, monthrange(y, em)[1]))
 
     # default: current month
-    from calendar import monthrange
-    return DateRange(date(today.year, today.month, 1), date(today.year, today.month, monthrange(today.year, today.month)[1]))
\ No newline at end of file
+    return DateRange(date(today.year, today.month, 1), date(today.year, today.month, monthrange(today.year, today.month)[1]))
@@ -1,12 +1,26 @@
 """Path utilities for the application."""
 
 from __future__ import annotations
+import os
 from pathlib import Path
 from typing import Optional
 
 from . import runs_dir
 
+def yaml_mtime_ns(folder: Path) -> int:
+    """Latest modification time of the YAML files in ``folder``, 0 if missing.
+
+    Cheap enough to call on every Streamlit rerun as a cache key.
+    """
+    if not folder.is_dir():
+        return 0
+    with os.scandir(folder) as it:
+        return max(
+            (e.stat().st_mtime_ns for e in it if e.name.endswith(".yaml")),
+            default=0,
+        )
+
 def latest_run_id() -> Optional[str]:
     """Get the latest run ID."""
-    candidates = [p.name for p in runs_dir().iterdir() if p.is_dir()]
-    return sorted(candidates)[-1] if candidates else None
\ No newline at end of file
+    with os.scandir(runs_dir()) as it:
+        return max((e.name for e in it if e.is_dir()), default=None)
\ No newline at end of file
@@ -1,8 +1,18 @@
+import os
 from pathlib import Path
 import orjson
 from typing import Any
 
 
-def write_json(obj: Any, path: Path) -> None:
+def write_json(obj: Any, path: Path, *, indent: bool = False) -> None:
+    """Write ``obj`` as JSON; pass ``indent=True`` for files meant for people."""
     path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_bytes(orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+    opt = orjson.OPT_SERIALIZE_NUMPY
+    if indent:
+        opt |= orjson.OPT_INDENT_2
+    data = orjson.dumps(obj, option=opt)
+    # Write beside the target and swap it in, so a failed write never leaves
+    # a truncated report behind
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
@@ -0,0 +1,32 @@
+"""Streamlit-cached loaders shared by the dashboard pages.
+
+Each loader is keyed by the newest modification time of its YAML files, so
+edits on disk are picked up on the next rerun.
+"""
+
+from __future__ import annotations
+
+import streamlit as st
+
+from .catalogs.loader import Catalogs, catalogs_mtime_ns, load_catalogs
+from .config.runtime_config import RuntimeConfig, load_runtime_config, runtime_config_mtime_ns
+
+
+@st.cache_resource(show_spinner=False)
+def _catalogs(data_dir: str, mtime_ns: int) -> Catalogs:
+    return load_catalogs(data_dir)
+
+
+@st.cache_data(show_spinner=False)
+def _runtime_config(data_dir: str, mtime_ns: int) -> RuntimeConfig:
+    return load_runtime_config(data_dir)
+
+
+def cached_catalogs(data_dir: str) -> Catalogs:
+    """Catalogs shared across reruns and sessions; callers must not mutate them."""
+    return _catalogs(data_dir, catalogs_mtime_ns(data_dir))
+
+
+def cached_runtime_config(data_dir: str) -> RuntimeConfig:
+    """Runtime config for one rerun; ``cache_data`` hands out a copy to mutate."""
+    return _runtime_config(data_dir, runtime_config_mtime_ns(data_dir))
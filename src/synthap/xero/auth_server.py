@@ -1,17 +1,27 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 import uvicorn
 import socket
 import logging
 import os
+import signal
+import subprocess
 import sys
 import time
 from ..config.settings import settings
+from . import oauth
 from .oauth import exchange_code_for_token, build_authorize_url, TokenStore
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
-app = FastAPI()
+@asynccontextmanager
+async def _lifespan(app: FastAPI):
+    yield
+    # Release the keep-alive connections to Xero's identity service
+    await oauth.aclose()
+
+app = FastAPI(lifespan=_lifespan)
 
 @app.get("/")
 async def root():
@@ -53,9 +63,20 @@ async def callback(request: Request):
         return {"status": "error", "error": "token_exchange_failed", "detail": str(e)}
 
 def is_port_in_use(port: int) -> bool:
-    """Check if a port is already in use."""
+    """Check if a port is already in use.
+
+    Binding is a single local syscall, unlike a connect probe which can wait
+    on a firewall timeout for closed ports. Off Windows, SO_REUSEADDR is set as
+    uvicorn does, so ports lingering in TIME_WAIT still count as free.
+    """
     with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-        return s.connect_ex(('localhost', port)) == 0
+        if os.name != 'nt':
+            s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            s.bind(('', port))
+        except OSError:
+            return True
+        return False
 
 def find_available_port(start_port: int = 5050, max_attempts: int = 10) -> int:
     """Find an available port starting from start_port."""
@@ -79,15 +100,50 @@ def get_port_from_redirect_uri():
     except Exception:
         return 5050  # Default port
 
+# Foreign address of a listening socket in ``netstat -aon``. Matching on it
+# rather than on the State column keeps working on localized Windows, where
+# LISTENING is printed as e.g. ABHÖREN or ÉCOUTE.
+_NO_PEER = {"0.0.0.0:0", "[::]:0", "*:*"}
+
+def _listening_pids(netstat_output: str, port: int) -> set[int]:
+    """PIDs of sockets listening on ``port`` in ``netstat -aon`` output."""
+    pids = set()
+    for line in netstat_output.splitlines():
+        parts = line.split()
+        # Proto, Local Address, Foreign Address, State, PID
+        if len(parts) != 5 or not parts[0].upper().startswith("TCP"):
+            continue
+        if parts[1].rpartition(":")[2] != str(port) or parts[2] not in _NO_PEER:
+            continue
+        if parts[4].isdigit() and parts[4] != "0":
+            pids.add(int(parts[4]))
+    return pids
+
+def _pids_listening_on(port: int) -> set[int]:
+    """PIDs with a listening TCP socket on ``port``, read from ``netstat -aon``."""
+    out = subprocess.run(
+        ["netstat", "-aon", "-p", "TCP"],
+        capture_output=True, text=True, errors="replace", check=False,
+    ).stdout
+    return _listening_pids(out, port)
+
 def kill_process_on_port(port: int):
     """Attempt to kill any process using the specified port on Windows."""
     if os.name == 'nt':  # Windows
         try:
-            os.system(f'for /f "tokens=5" %a in (\'netstat -aon ^| findstr :{port}\') do taskkill /F /PID %a')
-            logger.info(f"Attempted to kill any process using port {port}")
-            # Wait a moment for the port to be released
-            time.sleep(1)
-            return not is_port_in_use(port)
+            pids = _pids_listening_on(port)
+            if not pids:
+                return not is_port_in_use(port)
+            for pid in pids:
+                os.kill(pid, signal.SIGTERM)
+            logger.info(f"Terminated processes {sorted(pids)} using port {port}")
+            # Poll for up to a second for the port to be released
+            deadline = time.monotonic() + 1
+            while is_port_in_use(port):
+                if time.monotonic() >= deadline:
+                    return False
+                time.sleep(0.05)
+            return True
         except Exception as e:
             logger.warning(f"Could not kill processes on port {port}: {e}")
             return False
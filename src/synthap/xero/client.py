@@ -1,12 +1,17 @@
-from typing import Any, Optional
-import json
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+import asyncio
+import functools
+import importlib.util
 import logging
+import random
+import weakref
 
 import httpx
-from tenacity import retry, stop_after_attempt, wait_exponential_jitter
+import orjson
 
 from ..config.settings import settings
-from .oauth import TokenStore, refresh_token_if_needed
+from . import oauth
+from .oauth import TokenStore, refresh_token_if_needed, token_is_fresh
 
 # Set up module-level logger
 logger = logging.getLogger(__name__)
@@ -14,8 +19,90 @@ logger = logging.getLogger(__name__)
 XERO_BASE = "https://api.xero.com/api.xro/2.0"
 CONN_URL = "https://api.xero.com/connections"
 
+# Xero allows at most 5 in-flight API calls per tenant.
+MAX_CONCURRENT_REQUESTS = 5
+# Invoices sent per POST when inserting a run.
+INVOICES_PER_CALL = 50
+
 _TENANT_CACHE: Optional[str] = None
 
+
+class XeroRequestRefused(RuntimeError):
+    """Xero rate-limited the request, or still rejected it after a token refresh.
+
+    Retrying would only spend API quota, so these are not retried and batch
+    inserts stop at the first one.
+    """
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(f"Xero refused the request ({status_code}): {detail}")
+        self.status_code = status_code
+
+
+_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10)
+# httpx negotiates HTTP/2 only when the optional h2 package is installed
+# (``httpx[http2]``); concurrent batches then share one multiplexed connection.
+_HTTP2 = importlib.util.find_spec("h2") is not None
+_CLIENTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
+
+def _get_client() -> httpx.AsyncClient:
+    """Return the pooled HTTP client for the running event loop.
+
+    Reusing one client keeps TCP/TLS connections to Xero alive between calls.
+    httpx clients are tied to the loop they first ran on, and the CLI and pages
+    start a fresh loop per action via ``asyncio.run``, so one is kept per loop;
+    :func:`run_with_client` closes it when the action finishes.
+    """
+    loop = asyncio.get_running_loop()
+    client = _CLIENTS.get(loop)
+    if client is None:
+        client = httpx.AsyncClient(
+            base_url=XERO_BASE, timeout=60, limits=_LIMITS, http2=_HTTP2
+        )
+        _CLIENTS[loop] = client
+    return client
+
+async def close_client() -> None:
+    """Close the running loop's pooled clients, releasing their connections."""
+    client = _CLIENTS.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+    await oauth.aclose()
+
+T = TypeVar("T")
+
+def run_with_client(coro: Awaitable[T]) -> T:
+    """``asyncio.run`` for entry points making Xero calls.
+
+    The pooled client is closed before the loop shuts down, so keep-alive
+    connections are not left to the garbage collector.
+    """
+    async def _main() -> T:
+        try:
+            return await coro
+        finally:
+            await close_client()
+
+    return asyncio.run(_main())
+
+_TENANT_LOCKS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock]" = (
+    weakref.WeakKeyDictionary()
+)
+
+def _tenant_lock() -> asyncio.Lock:
+    """Per-loop lock so concurrent first calls share one /connections lookup."""
+    loop = asyncio.get_running_loop()
+    lock = _TENANT_LOCKS.get(loop)
+    if lock is None:
+        lock = _TENANT_LOCKS[loop] = asyncio.Lock()
+    return lock
+
+def _pretty(obj: Any) -> str:
+    """Indented JSON for log messages."""
+    return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+
 def _auth_headers(tok: dict) -> dict[str, str]:
     return {
         "Authorization": f"Bearer {tok['access_token']}",
@@ -43,66 +130,86 @@ def debug_token():
 
 async def resolve_tenant_id(tok: dict) -> tuple[str, dict]:
     """Resolve tenant ID, refreshing tokens on 401 responses."""
-    global _TENANT_CACHE
-    
     # If tenant ID is in the token, use it
-    if 'tenant_id' in tok and tok['tenant_id']:
-        logger.info(f"Using tenant ID from token: {tok['tenant_id']}")
+    if tok.get('tenant_id'):
+        logger.debug("Using tenant ID from token: %s", tok["tenant_id"])
         return tok['tenant_id'], tok
         
     # If tenant ID is in settings, use it
     if settings.xero_tenant_id and settings.xero_tenant_id != "REPLACE_ME":
-        logger.info(f"Using tenant ID from settings: {settings.xero_tenant_id}")
+        logger.debug("Using tenant ID from settings: %s", settings.xero_tenant_id)
         return settings.xero_tenant_id, tok
         
     # If tenant ID is in cache, use it
     if _TENANT_CACHE:
-        logger.info(f"Using cached tenant ID: {_TENANT_CACHE}")
+        logger.debug("Using cached tenant ID: %s", _TENANT_CACHE)
         return _TENANT_CACHE, tok
 
-    # Otherwise, fetch from connections API
+    async with _tenant_lock():
+        # Another task may have resolved it while we waited
+        if _TENANT_CACHE:
+            return _TENANT_CACHE, tok
+        return await _fetch_tenant_id(tok)
+
+async def _fetch_tenant_id(tok: dict) -> tuple[str, dict]:
+    """Look up the first organisation tenant via the connections API."""
+    global _TENANT_CACHE
+
     logger.info("Fetching tenant ID from connections API")
-    async with httpx.AsyncClient(timeout=30) as client:
+    client = _get_client()
+    r = await client.get(CONN_URL, headers=_auth_headers(tok))
+    if r.status_code == 401:
+        # Refresh the token if unauthorized
+        logger.info("Connections API returned 401, refreshing token")
+        tok = await refresh_token_if_needed()
         r = await client.get(CONN_URL, headers=_auth_headers(tok))
-        if r.status_code == 401:
-            # Refresh the token if unauthorized
-            logger.info("Connections API returned 401, refreshing token")
-            tok = await refresh_token_if_needed()
-            r = await client.get(CONN_URL, headers=_auth_headers(tok))
-        
-        r.raise_for_status()
-        conns = r.json()
-        logger.debug(f"Got connections: {json.dumps(conns, indent=2)}")
-        
-        # choose first ORGANISATION that is active
-        for c in conns:
-            if c.get("tenantType") == "ORGANISATION" and c.get("tenantId"):
-                _TENANT_CACHE = c["tenantId"]
-                # Save the tenant_id in the token file for future use
-                tok["tenant_id"] = _TENANT_CACHE
-                TokenStore.save(tok)
-                logger.info(f"Found and saved tenant ID: {_TENANT_CACHE}")
-                return _TENANT_CACHE, tok
-                
-        raise RuntimeError(
-            "No Xero organisation connection found for this token. Check app consent."
-        )
+    
+    r.raise_for_status()
+    conns = orjson.loads(r.content)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Got connections: %s", _pretty(conns))
+    
+    # choose first ORGANISATION that is active
+    for c in conns:
+        if c.get("tenantType") == "ORGANISATION" and c.get("tenantId"):
+            _TENANT_CACHE = c["tenantId"]
+            # Save the tenant_id in the token file for future use
+            tok["tenant_id"] = _TENANT_CACHE
+            TokenStore.save(tok)
+            logger.info(f"Found and saved tenant ID: {_TENANT_CACHE}")
+            return _TENANT_CACHE, tok
+            
+    raise RuntimeError(
+        "No Xero organisation connection found for this token. Check app consent."
+    )
 
 def _with_tenant(headers: dict[str, str], tenant_id: str) -> dict[str, str]:
     h = dict(headers)
     h["Xero-tenant-id"] = tenant_id
     return h
 
+# (access_token, tenant_id) and the request headers built for them. httpx
+# copies headers into each request, so one dict is shared until the token
+# or tenant changes.
+_HEADERS_CACHE: Optional[tuple[tuple[str, str], dict[str, str]]] = None
+
+def _request_headers(tok: dict, tenant_id: str) -> dict[str, str]:
+    global _HEADERS_CACHE
+    key = (tok["access_token"], tenant_id)
+    if _HEADERS_CACHE is None or _HEADERS_CACHE[0] != key:
+        _HEADERS_CACHE = (key, _with_tenant(_auth_headers(tok), tenant_id))
+    return _HEADERS_CACHE[1]
+
 def _raise_with_context(resp: httpx.Response) -> None:
     try:
-        body = resp.json()  # Attempt to parse JSON response
+        body = orjson.loads(resp.content)  # Attempt to parse JSON response
     except Exception:
         body = resp.text  # Fallback to raw text if JSON parsing fails
     msg = (
         f"HTTP {resp.status_code} {resp.reason_phrase} "
         f"at {resp.request.method} {resp.request.url}\n{body}"
     )
-    resp.raise_for_status()  # will raise HTTPStatusError (tenacity sees it)
+    resp.raise_for_status()  # will raise HTTPStatusError (_retry sees it)
     # if somehow not raised:
     raise httpx.HTTPStatusError(message=msg, request=resp.request, response=resp)
 
@@ -126,109 +233,167 @@ def validate_invoice_payload(invoices: list[dict[str, Any]]) -> None:
             if not line_item.get("TaxType"):
                 raise ValueError("LineItem TaxType is required")
 
+# (collection key, element name, required key) for nested contact lists.
+_CONTACT_LISTS = (
+    ("Addresses", "Address", "AddressType"),
+    ("Phones", "Phone", "PhoneType"),
+)
+
 def validate_contact_payload(contacts: list[dict[str, Any]]) -> None:
     """Validate contact payload before sending to Xero API."""
     for contact in contacts:
         if not contact.get("Name"):
             raise ValueError("Contact Name is required")
-            
-        # Check for proper structure of Addresses
-        if "Addresses" in contact:
-            if not isinstance(contact["Addresses"], list):
-                raise ValueError("Addresses must be an array")
-            for address in contact["Addresses"]:
-                if not isinstance(address, dict):
-                    raise ValueError("Each Address must be an object")
-                if "AddressType" not in address:
-                    raise ValueError("AddressType is required in Address")
-                    
-        # Check for proper structure of Phones
-        if "Phones" in contact:
-            if not isinstance(contact["Phones"], list):
-                raise ValueError("Phones must be an array")
-            for phone in contact["Phones"]:
-                if not isinstance(phone, dict):
-                    raise ValueError("Each Phone must be an object")
-                if "PhoneType" not in phone:
-                    raise ValueError("PhoneType is required in Phone")
-
-@retry(wait=wait_exponential_jitter(1, 3), stop=stop_after_attempt(5))
-async def post_invoices(invoices: list[dict[str, Any]]) -> dict[str, Any]:
-    validate_invoice_payload(invoices)  # Validate payload before sending
+
+        # Check for proper structure of Addresses and Phones
+        for key, name, required in _CONTACT_LISTS:
+            if key not in contact:
+                continue
+            entries = contact[key]
+            if not isinstance(entries, list):
+                raise ValueError(f"{key} must be an array")
+            for entry in entries:
+                if not isinstance(entry, dict):
+                    raise ValueError(f"Each {name} must be an object")
+                if required not in entry:
+                    raise ValueError(f"{required} is required in {name}")
+
+_RETRY_ATTEMPTS = 5
+
+def _retry(fn: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+    """Retry ``fn`` on Xero server errors and transport failures.
+
+    Up to five attempts, waiting ``2**n`` seconds plus up to one second of
+    jitter between them, capped at three seconds. Anything else, including
+    validation errors and :class:`XeroRequestRefused`, raises immediately
+    since repeating the request would not change the outcome.
+    """
+    @functools.wraps(fn)
+    async def wrapper(*args: Any, **kwargs: Any) -> T:
+        attempt = 0
+        while True:
+            try:
+                return await fn(*args, **kwargs)
+            except (httpx.HTTPStatusError, httpx.TransportError) as e:
+                client_error = (
+                    isinstance(e, httpx.HTTPStatusError) and e.response.status_code < 500
+                )
+                if client_error or attempt == _RETRY_ATTEMPTS - 1:
+                    raise
+                delay = min(2**attempt + random.uniform(0, 1), 3)
+                logger.warning("%s failed (%s); retrying in %.1fs", fn.__name__, e, delay)
+                await asyncio.sleep(delay)
+                attempt += 1
+
+    return wrapper
+
+async def _xero_request(method: str, path: str, body: Optional[bytes] = None) -> httpx.Response:
+    """Send an authenticated accounting API request on the shared client.
+
+    Loads the stored token (refreshing when there is none or it is about to
+    expire), resolves the tenant, and retries once with a refreshed token if
+    Xero still answers 401. A 403 means the stored tenant is no longer
+    connected to the token, so the retry also looks the tenant up again.
+    Server errors raise so the callers' retry policy sees them; 4xx bodies
+    carry Xero's validation messages and are returned to the caller.
+    """
     tok = TokenStore.load()
-    if not tok:
+    if not token_is_fresh(tok):
         tok = await refresh_token_if_needed()
     tenant_id, tok = await resolve_tenant_id(tok)
-    headers = _with_tenant(_auth_headers(tok), tenant_id)
-    payload = {"Invoices": invoices}
 
-    async with httpx.AsyncClient(timeout=60) as client:
-        r = await client.post(f"{XERO_BASE}/Invoices", json=payload, headers=headers)
-        if r.status_code == 401:
-            # try refresh once
+    url = f"/{path}"
+    send = getattr(_get_client(), method.lower())
+    kwargs = {} if body is None else {"content": body}
+    r = await send(url, headers=_request_headers(tok, tenant_id), **kwargs)
+    if r.status_code in (401, 403):
+        # try refresh once
+        logger.info("Xero returned %s for %s %s, refreshing token", r.status_code, method, path)
+        if r.status_code == 403:
+            global _TENANT_CACHE
+            _TENANT_CACHE = None
+            tok = await refresh_token_if_needed(force_refresh_tenant=True)
+        else:
             tok = await refresh_token_if_needed()
-            tenant_id, tok = await resolve_tenant_id(tok)
-            r = await client.post(
-                f"{XERO_BASE}/Invoices",
-                json=payload,
-                headers=_with_tenant(_auth_headers(tok), tenant_id),
-            )
-        if r.status_code >= 400:
-            logger.error("Xero API error response: %s", r.text)
-            logger.error("Payload sent: %s", json.dumps(payload, indent=2))
-        return r.json()
-
-@retry(wait=wait_exponential_jitter(1, 3), stop=stop_after_attempt(5))
+        tenant_id, tok = await resolve_tenant_id(tok)
+        r = await send(url, headers=_request_headers(tok, tenant_id), **kwargs)
+    logger.debug("%s %s -> %s over %s", method, path, r.status_code, r.http_version)
+    if r.status_code >= 500:
+        _raise_with_context(r)
+    return r
+
+@_retry
+async def post_invoices(invoices: list[dict[str, Any]]) -> dict[str, Any]:
+    validate_invoice_payload(invoices)  # Validate payload before sending
+    payload = {"Invoices": invoices}
+    r = await _xero_request("POST", "Invoices", orjson.dumps(payload))
+    if r.status_code in (401, 429):
+        raise XeroRequestRefused(r.status_code, r.text)
+    if r.status_code >= 400:
+        logger.error("Xero API error response: %s", r.text)
+        logger.error("Payload sent: %s", _pretty(payload))
+    return orjson.loads(r.content)
+
+@_retry
 async def post_payments(payments: list[dict[str, Any]]) -> dict[str, Any]:
     """Post payments to Xero API."""
-    tok = TokenStore.load()
-    if not tok:
-        tok = await refresh_token_if_needed()
-    tenant_id, tok = await resolve_tenant_id(tok)
-    headers = _with_tenant(_auth_headers(tok), tenant_id)
     payload = {"Payments": payments}
+    # Xero creates payments with PUT; POST is for updating them
+    r = await _xero_request("PUT", "Payments", orjson.dumps(payload))
+    if r.status_code in (401, 429):
+        raise XeroRequestRefused(r.status_code, r.text)
+    if r.status_code >= 400:
+        logger.error("Xero API error response: %s", r.text)
+        logger.error("Payload sent: %s", _pretty(payload))
+    return orjson.loads(r.content)
 
-    async with httpx.AsyncClient(timeout=60) as client:
-        r = await client.post(f"{XERO_BASE}/Payments", json=payload, headers=headers)
-        if r.status_code == 401:
-            # try refresh once
-            tok = await refresh_token_if_needed()
-            tenant_id, tok = await resolve_tenant_id(tok)
-            r = await client.post(
-                f"{XERO_BASE}/Payments",
-                json=payload,
-                headers=_with_tenant(_auth_headers(tok), tenant_id),
-            )
-        if r.status_code >= 400:
-            logger.error("Xero API error response: %s", r.text)
-            logger.error("Payload sent: %s", json.dumps(payload, indent=2))
-        return r.json()
-
-@retry(wait=wait_exponential_jitter(1, 3), stop=stop_after_attempt(5))
+async def post_invoices_batched(
+    invoices: list[dict[str, Any]],
+    post: Optional[Callable[[list[dict[str, Any]]], Awaitable[dict[str, Any]]]] = None,
+) -> list[tuple[list[dict[str, Any]], Any]]:
+    """Post ``invoices`` in chunks of ``INVOICES_PER_CALL``, concurrently.
+
+    At most ``MAX_CONCURRENT_REQUESTS`` chunks are in flight. Returns
+    ``(batch, result)`` pairs in submission order, where ``result`` is the
+    response body or the exception the batch failed with. After a
+    :class:`XeroRequestRefused`, chunks not yet sent are skipped and report
+    that refusal; chunks already in flight finish, so invoices Xero did
+    create are still returned. ``post`` defaults to :func:`post_invoices`.
+    """
+    post = post or post_invoices
+    batches = [
+        invoices[i : i + INVOICES_PER_CALL] for i in range(0, len(invoices), INVOICES_PER_CALL)
+    ]
+    sem = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    refused: Optional[XeroRequestRefused] = None
+
+    async def _post(batch):
+        nonlocal refused
+        async with sem:
+            if refused is not None:
+                return refused
+            try:
+                return await post(batch)
+            except XeroRequestRefused as e:
+                if refused is None:
+                    refused = e
+                    logger.error("Stopping batch insert: %s", e)
+                return e
+            except Exception as e:
+                return e
+
+    results = await asyncio.gather(*(_post(b) for b in batches))
+    return list(zip(batches, results))
+
+@_retry
 async def get_contacts() -> dict[str, Any]:
     """Get contacts from Xero API."""
-    tok = TokenStore.load()
-    if not tok:
-        tok = await refresh_token_if_needed()
-    tenant_id, tok = await resolve_tenant_id(tok)
-    headers = _with_tenant(_auth_headers(tok), tenant_id)
+    r = await _xero_request("GET", "Contacts")
+    if r.status_code >= 400:
+        logger.error("Xero API error response: %s", r.text)
+    return orjson.loads(r.content)
 
-    async with httpx.AsyncClient(timeout=60) as client:
-        r = await client.get(f"{XERO_BASE}/Contacts", headers=headers)
-        if r.status_code == 401:
-            # try refresh once
-            logger.info("Token expired during get_contacts, refreshing...")
-            tok = await refresh_token_if_needed()
-            tenant_id, tok = await resolve_tenant_id(tok)
-            r = await client.get(
-                f"{XERO_BASE}/Contacts",
-                headers=_with_tenant(_auth_headers(tok), tenant_id),
-            )
-        if r.status_code >= 400:
-            logger.error("Xero API error response: %s", r.text)
-        return r.json()
-
-@retry(wait=wait_exponential_jitter(1, 3), stop=stop_after_attempt(5))
+@_retry
 async def create_contacts(contacts: list[dict[str, Any]]) -> dict[str, Any]:
     """Create contacts in Xero API."""
     logger.info(f"Creating {len(contacts)} contacts in Xero")
@@ -236,44 +401,22 @@ async def create_contacts(contacts: list[dict[str, Any]]) -> dict[str, Any]:
     # Validate contacts structure
     validate_contact_payload(contacts)
     
-    tok = TokenStore.load()
-    if not tok:
-        tok = await refresh_token_if_needed()
-        
-    # Debug token before using it
-    debug_token()
+    # Dump token details only when debugging
+    if logger.isEnabledFor(logging.DEBUG):
+        debug_token()
     
-    tenant_id, tok = await resolve_tenant_id(tok)
-    headers = _with_tenant(_auth_headers(tok), tenant_id)
     payload = {"Contacts": contacts}
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Xero create_contacts payload: %s", _pretty(payload))
+    logger.info(f"Sending request to {XERO_BASE}/Contacts")
     
-    logger.debug(f"Xero create_contacts payload: {json.dumps(payload, indent=2)}")
+    r = await _xero_request("POST", "Contacts", orjson.dumps(payload))
     
-    async with httpx.AsyncClient(timeout=60) as client:
-        # Log the full request details for debugging
-        logger.info(f"Sending request to {XERO_BASE}/Contacts with tenant ID: {tenant_id}")
-        logger.debug(f"Headers: {json.dumps(headers, indent=2)}")
-        
-        r = await client.post(f"{XERO_BASE}/Contacts", json=payload, headers=headers)
-        if r.status_code == 401:
-            logger.info("Token expired, refreshing...")
-            tok = await refresh_token_if_needed()
-            tenant_id, tok = await resolve_tenant_id(tok)
-            
-            # Log refreshed token info
-            logger.info(f"Using refreshed token with tenant ID: {tenant_id}")
-            
-            r = await client.post(
-                f"{XERO_BASE}/Contacts",
-                json=payload,
-                headers=_with_tenant(_auth_headers(tok), tenant_id),
-            )
-        
-        if r.status_code >= 400:
-            logger.error(f"Xero API error response: {r.text}")
-            logger.error(f"Payload sent: {json.dumps(payload, indent=2)}")
-        else:
-            logger.info(f"Successfully created contacts in Xero")
-            logger.debug(f"Xero response: {r.text}")
-        
-        return r.json()
\ No newline at end of file
+    if r.status_code >= 400:
+        logger.error(f"Xero API error response: {r.text}")
+        logger.error(f"Payload sent: {_pretty(payload)}")
+    else:
+        logger.info(f"Successfully created contacts in Xero")
+        logger.debug("Xero response: %s", r.text)
+    
+    return orjson.loads(r.content)
@@ -1,7 +1,9 @@
 from __future__ import annotations
-from typing import Dict, Any, TYPE_CHECKING
+from typing import Dict, Any, List, TYPE_CHECKING
 
 if TYPE_CHECKING:
+    import pandas as pd
+
     from ..engine.generator import Invoice, InvoiceLine
 
 def map_invoice(inv: "Invoice") -> Dict[str, Any]:
@@ -25,3 +27,63 @@ def map_invoice(inv: "Invoice") -> Dict[str, Any]:
             } for ln in inv.lines
         ],
     }
+
+
+def map_staged_invoices(inv_df: "pd.DataFrame", line_df: "pd.DataFrame") -> List[Dict[str, Any]]:
+    """Build Xero invoice payloads from a run's staged parquet frames.
+
+    Payloads are ordered by reference; each uses the first header row for its
+    reference. Columns are converted once up front and rows are grouped in a
+    single pass rather than through per-reference DataFrame lookups. A missing
+    or empty invoice number falls back to the reference.
+    """
+    heads = inv_df.drop_duplicates("reference").set_index("reference", drop=False).to_dict("index")
+    line_df = line_df[line_df["reference"].notna()]
+    columns = zip(
+        line_df["reference"].tolist(),
+        line_df["description"].tolist(),
+        line_df["quantity"].astype(float).tolist(),
+        line_df["unit_amount"].astype(float).tolist(),
+        line_df["account_code"].astype(str).tolist(),
+        line_df["tax_type"].astype(str).tolist(),
+        line_df["line_amount"].astype(float).tolist(),
+    )
+    lines_by_ref: Dict[Any, List[Dict[str, Any]]] = {}
+    for ref, desc, qty, unit, account, tax, amount in columns:
+        lines_by_ref.setdefault(ref, []).append(
+            {
+                "Description": desc,
+                "Quantity": qty,
+                "UnitAmount": unit,
+                "AccountCode": account,
+                "TaxType": tax,
+                "LineAmount": amount,
+            }
+        )
+
+    payloads = []
+    for ref in sorted(lines_by_ref):
+        head = heads[ref]
+        payloads.append(
+            {
+                "Type": "ACCPAY",
+                "Contact": {"ContactID": head["contact_id"]},
+                "CurrencyCode": head["currency"],
+                "LineItems": lines_by_ref[ref],
+                "Date": head["date"],
+                "DueDate": head["due_date"],
+                "Reference": ref,
+                "InvoiceNumber": head.get("invoice_number") or ref,
+                "Status": head["status"],
+            }
+        )
+    return payloads
+
+
+def vendor_ids_by_reference(inv_df: "pd.DataFrame") -> Dict[Any, Any]:
+    """Map each staged invoice reference to the vendor id of its first row."""
+    heads = inv_df.drop_duplicates("reference")
+    refs = heads["reference"].tolist()
+    if "vendor_id" not in heads.columns:
+        return dict.fromkeys(refs)
+    return dict(zip(refs, heads["vendor_id"].tolist()))
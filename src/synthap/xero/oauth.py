@@ -1,7 +1,13 @@
-import json
+import asyncio
+import functools
+import importlib.util
 import os
+import tempfile
+import time
+import weakref
 from pathlib import Path
 import httpx
+import orjson
 from urllib.parse import urlencode
 from typing import Dict, Optional, List
 from ..config.settings import settings
@@ -24,27 +30,109 @@ def _auth_headers(tok: dict) -> dict[str, str]:
         "Content-Type": "application/json",
     }
 
+_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+# With h2 installed the token and connections calls share one HTTP/2 connection
+_HTTP2 = importlib.util.find_spec("h2") is not None
+_CLIENTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
+
+def _get_client() -> httpx.AsyncClient:
+    """Return the running loop's client for the identity and connections calls.
+
+    Keeping it open lets a token refresh and the connections lookup that
+    follows it, and later refreshes, reuse the TLS connections to Xero.
+    """
+    loop = asyncio.get_running_loop()
+    client = _CLIENTS.get(loop)
+    if client is None:
+        client = _CLIENTS[loop] = httpx.AsyncClient(
+            timeout=30, limits=_LIMITS, http2=_HTTP2
+        )
+    return client
+
+async def aclose() -> None:
+    """Close the running loop's OAuth client, releasing its connections."""
+    client = _CLIENTS.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+# Refresh this many seconds before Xero's stated expiry
+_EXPIRY_MARGIN = 30
+
+def _stamp_expiry(tok: dict) -> None:
+    """Record when a freshly issued access token should be treated as expired."""
+    tok["expires_at"] = time.time() + int(tok.get("expires_in") or 1800) - _EXPIRY_MARGIN
+
+def token_is_fresh(tok: Optional[dict]) -> bool:
+    """Whether ``tok`` can be used without refreshing first.
+
+    Tokens saved before expiry stamping have no ``expires_at``; they are used
+    as-is and a 401 triggers the refresh.
+    """
+    if not tok or "access_token" not in tok:
+        return False
+    expires_at = tok.get("expires_at")
+    return expires_at is None or expires_at > time.time()
+
 class TokenStore:
+    # (path, mtime_ns, size) of the last parsed token file and its contents.
+    # The token is re-read only when the file changes on disk.
+    _cache: Optional[tuple[tuple[str, int, int], Dict]] = None
+
     @classmethod
     def load(cls) -> Optional[Dict]:
         p = _token_path()
-        if not p.exists():
+        try:
+            st = p.stat()
+        except FileNotFoundError:
             logger.warning(f"Token file not found at {p}")
             return None
+        key = (str(p), st.st_mtime_ns, st.st_size)
+        if cls._cache is not None and cls._cache[0] == key:
+            # Callers may add keys before saving, so hand out a copy
+            return dict(cls._cache[1])
         try:
-            token_data = json.loads(p.read_text())
+            token_data = orjson.loads(p.read_bytes())
             logger.debug(f"Loaded token with keys: {list(token_data.keys())}")
-            return token_data
+            cls._cache = (key, token_data)
+            return dict(token_data)
         except Exception as e:
             logger.error(f"Error loading token: {str(e)}")
             return None
 
     @classmethod
     def save(cls, tok: Dict) -> None:
+        cls._cache = None
         try:
             token_path = _token_path()
-            token_path.parent.mkdir(exist_ok=True, parents=True)
-            token_path.write_text(json.dumps(tok, indent=2))
+            # Write to a uniquely named file beside the target and swap it in,
+            # so readers never see a half-written token even when Streamlit
+            # threads save concurrently
+            data = orjson.dumps(tok)
+            new_tmp = functools.partial(
+                tempfile.NamedTemporaryFile,
+                dir=token_path.parent, prefix=f"{token_path.name}.", suffix=".tmp", delete=False,
+            )
+            try:
+                tmp = new_tmp()
+            except FileNotFoundError:
+                # First save: create the token directory
+                token_path.parent.mkdir(exist_ok=True, parents=True)
+                tmp = new_tmp()
+            try:
+                with tmp:
+                    tmp.write(data)
+                # Stat our own file: another thread may replace the token
+                # again before we could stat it by path
+                st = os.stat(tmp.name)
+                os.replace(tmp.name, token_path)
+            except BaseException:
+                os.unlink(tmp.name)
+                raise
+            # Seed the cache with what was just written so the next load
+            # does not parse the file back
+            cls._cache = ((str(token_path), st.st_mtime_ns, st.st_size), dict(tok))
             logger.info(f"Saved token to {token_path}")
         except Exception as e:
             logger.error(f"Error saving token: {str(e)}")
@@ -52,6 +140,7 @@ class TokenStore:
     @classmethod
     def clear(cls) -> None:
         """Clear the token file to force a new authentication"""
+        cls._cache = None
         p = _token_path()
         if p.exists():
             p.unlink()
@@ -134,41 +223,69 @@ async def exchange_code_for_token(code: str) -> Dict:
     
     logger.info(f"Exchanging code for token with client ID: {settings.xero_client_id}")
     
-    async with httpx.AsyncClient(timeout=30) as client:
-        r = await client.post(TOKEN_URL, data=data, auth=auth)
-        r.raise_for_status()
-        tok = r.json()
-        
-        logger.info(f"Token exchange successful. Received token with keys: {list(tok.keys())}")
-        
-        # Get tenant ID immediately after authentication
-        headers = _auth_headers(tok)
-        r = await client.get(CONN_URL, headers=headers)
-        r.raise_for_status()
-        conns = r.json()
-        
-        logger.info(f"Found {len(conns)} connections")
-        
-        # Choose first ORGANISATION that is active
-        for c in conns:
-            if c.get("tenantType") == "ORGANISATION" and c.get("tenantId"):
-                # Add tenant ID to the token data
-                tok["tenant_id"] = c["tenantId"]
-                # Log the tenant ID and access token
-                logger.info(f"✓ Tenant ID: {tok['tenant_id']}")
-                logger.info(f"✓ Access token (first 10 chars): {tok['access_token'][:10]}...")
-                break
-        
-        if "tenant_id" not in tok:
-            logger.error("No tenant ID found in connections response")
-                
+    client = _get_client()
+    r = await client.post(TOKEN_URL, data=data, auth=auth)
+    r.raise_for_status()
+    tok = orjson.loads(r.content)
+    _stamp_expiry(tok)
+    
+    logger.info(f"Token exchange successful. Received token with keys: {list(tok.keys())}")
+    
+    # Get tenant ID immediately after authentication
+    headers = _auth_headers(tok)
+    r = await client.get(CONN_URL, headers=headers)
+    r.raise_for_status()
+    conns = orjson.loads(r.content)
+    
+    logger.info(f"Found {len(conns)} connections")
+    
+    # Choose first ORGANISATION that is active
+    for c in conns:
+        if c.get("tenantType") == "ORGANISATION" and c.get("tenantId"):
+            # Add tenant ID to the token data
+            tok["tenant_id"] = c["tenantId"]
+            # Log the tenant ID and access token
+            logger.info(f"✓ Tenant ID: {tok['tenant_id']}")
+            logger.info(f"✓ Access token (first 10 chars): {tok['access_token'][:10]}...")
+            break
+    
+    if "tenant_id" not in tok:
+        logger.error("No tenant ID found in connections response")
+            
     TokenStore.save(tok)
     return tok
 
-async def refresh_token_if_needed() -> Dict:
+_REFRESH_LOCKS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock]" = (
+    weakref.WeakKeyDictionary()
+)
+
+def _refresh_lock() -> asyncio.Lock:
+    """Per-loop lock so concurrent 401s share one token refresh."""
+    loop = asyncio.get_running_loop()
+    lock = _REFRESH_LOCKS.get(loop)
+    if lock is None:
+        lock = _REFRESH_LOCKS[loop] = asyncio.Lock()
+    return lock
+
+async def refresh_token_if_needed(force_refresh_tenant: bool = False) -> Dict:
     """
     Refresh the OAuth token.
     
+    Callers that queued behind a refresh already in flight get its result
+    instead of refreshing again. The tenant stored with the token is kept
+    unless ``force_refresh_tenant`` is set or there is none, in which case
+    it is looked up again via the connections API.
+    """
+    stale = TokenStore.load()
+    async with _refresh_lock():
+        current = TokenStore.load()
+        if current and stale and current.get("access_token") != stale.get("access_token"):
+            logger.info("Token was refreshed while waiting; reusing it")
+            return current
+        return await _refresh_token(force_refresh_tenant)
+
+async def _refresh_token(force_refresh_tenant: bool = False) -> Dict:
+    """
     Always refreshes the token and updates tenant ID.
     """
     tok = TokenStore.load()
@@ -185,35 +302,42 @@ async def refresh_token_if_needed() -> Dict:
     logger.info(f"Refreshing token using refresh_token (first 10 chars): {tok['refresh_token'][:10]}...")
     
     try:
-        async with httpx.AsyncClient(timeout=30) as client:
-            r = await client.post(TOKEN_URL, data=data, auth=auth)
-            r.raise_for_status()
-            newtok = r.json()
-            
-            logger.info(f"Token refresh successful. Received new token with keys: {list(newtok.keys())}")
-            
-            # Also fetch the connections to update the tenant ID
-            headers = _auth_headers(newtok)
-            r = await client.get(CONN_URL, headers=headers)
-            r.raise_for_status()
-            conns = r.json()
-            
-            logger.info(f"Found {len(conns)} connections after refresh")
-            
-            # Choose first ORGANISATION that is active
-            for c in conns:
-                if c.get("tenantType") == "ORGANISATION" and c.get("tenantId"):
-                    # Add tenant ID to the token data
-                    newtok["tenant_id"] = c["tenantId"]
-                    logger.info(f"[OK] Refreshed token with tenant ID: {newtok['tenant_id']}")
-                    break
-            
-            if "tenant_id" not in newtok:
-                logger.error("No tenant ID found in connections response after refresh")
-                # If we had a tenant ID in the old token, preserve it
-                if "tenant_id" in tok:
-                    newtok["tenant_id"] = tok["tenant_id"]
-                    logger.info(f"Preserving previous tenant ID: {newtok['tenant_id']}")
+        client = _get_client()
+        r = await client.post(TOKEN_URL, data=data, auth=auth)
+        r.raise_for_status()
+        newtok = orjson.loads(r.content)
+        _stamp_expiry(newtok)
+        
+        logger.info(f"Token refresh successful. Received new token with keys: {list(newtok.keys())}")
+        
+        if tok.get("tenant_id") and not force_refresh_tenant:
+            # A refresh does not move the organisation; skip the round-trip
+            newtok["tenant_id"] = tok["tenant_id"]
+            TokenStore.save(newtok)
+            return newtok
+        
+        # Also fetch the connections to update the tenant ID
+        headers = _auth_headers(newtok)
+        r = await client.get(CONN_URL, headers=headers)
+        r.raise_for_status()
+        conns = orjson.loads(r.content)
+        
+        logger.info(f"Found {len(conns)} connections after refresh")
+        
+        # Choose first ORGANISATION that is active
+        for c in conns:
+            if c.get("tenantType") == "ORGANISATION" and c.get("tenantId"):
+                # Add tenant ID to the token data
+                newtok["tenant_id"] = c["tenantId"]
+                logger.info(f"[OK] Refreshed token with tenant ID: {newtok['tenant_id']}")
+                break
+        
+        if "tenant_id" not in newtok:
+            logger.error("No tenant ID found in connections response after refresh")
+            # If we had a tenant ID in the old token, preserve it
+            if "tenant_id" in tok:
+                newtok["tenant_id"] = tok["tenant_id"]
+                logger.info(f"Preserving previous tenant ID: {newtok['tenant_id']}")
         
         TokenStore.save(newtok)
         return newtok
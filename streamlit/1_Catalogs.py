@@ -5,12 +5,32 @@ from __future__ import annotations
 import pandas as pd
 import streamlit as st
 
-from synthap.catalogs.loader import load_catalogs
+from synthap.catalogs.loader import Item, Vendor, catalogs_mtime_ns, load_catalogs
 from synthap.config.settings import settings
 
 
-def _as_df(records: list[dict]) -> pd.DataFrame:
-    return pd.DataFrame(records)
+def _as_df(records: list, model: type) -> pd.DataFrame:
+    """Frame of catalog models, built column by column from their attributes."""
+    return pd.DataFrame(
+        {c: [getattr(r, c) for r in records] for c in model.model_fields}
+    )
+
+
+@st.cache_data(show_spinner=False)
+def _catalog_frames(
+    data_dir: str, mtime_ns: int
+) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """Vendor, item and vendor-item frames; ``mtime_ns`` keys the cache."""
+    cat = load_catalogs(data_dir)
+    vendor_items = pd.DataFrame({
+        "vendor_id": list(cat.vendor_items),
+        "item_codes": [", ".join(codes) for codes in cat.vendor_items.values()],
+    })
+    return (
+        _as_df(cat.vendors, Vendor),
+        _as_df(cat.items, Item),
+        vendor_items,
+    )
 
 
 def main() -> None:
@@ -21,7 +41,10 @@ def main() -> None:
 
     st.title("Catalogs")
 
-    cat = load_catalogs(settings.data_dir)
+    data_dir = str(settings.data_dir)
+    vendors_df, items_df, vendor_items_df = _catalog_frames(
+        data_dir, catalogs_mtime_ns(data_dir)
+    )
 
     vendors_tab, items_tab, mapping_tab = st.tabs([
         "Vendors",
@@ -31,25 +54,21 @@ def main() -> None:
 
     with vendors_tab:
         st.dataframe(
-            _as_df([v.model_dump() for v in cat.vendors]),
+            vendors_df,
             use_container_width=True,
             hide_index=True,
         )
 
     with items_tab:
         st.dataframe(
-            _as_df([i.model_dump() for i in cat.items]),
+            items_df,
             use_container_width=True,
             hide_index=True,
         )
 
     with mapping_tab:
-        vi = [
-            {"vendor_id": vid, "item_codes": ", ".join(codes)}
-            for vid, codes in cat.vendor_items.items()
-        ]
         st.dataframe(
-            _as_df(vi),
+            vendor_items_df,
             use_container_width=True,
             hide_index=True,
         )
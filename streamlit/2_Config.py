@@ -49,19 +49,34 @@ def _unflatten_dict(d: dict[str, Any], sep: str = ".") -> dict[str, Any]:
     return out
 
 
+def _mtime_ns(path: Path) -> int:
+    try:
+        return path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return 0
+
+
+@st.cache_data(show_spinner=False)
+def _defaults_flat(path: str, mtime_ns: int) -> tuple[RuntimeConfig, pd.DataFrame]:
+    """Default config and its flattened table; ``mtime_ns`` keys the cache."""
+    defaults_cfg = RuntimeConfig(**_load_yaml(Path(path)))
+    defaults_df = pd.DataFrame(
+        list(_flatten_dict(defaults_cfg.model_dump()).items()),
+        columns=["Setting", "Value"],
+    )
+    return defaults_cfg, defaults_df
+
+
 def main() -> None:
     st.title("Configuration")
 
-    defaults_cfg = RuntimeConfig(**_load_yaml(_defaults_path(settings.data_dir)))
+    defaults_path = _defaults_path(settings.data_dir)
+    defaults_cfg, defaults_df = _defaults_flat(str(defaults_path), _mtime_ns(defaults_path))
     cfg = load_runtime_config(settings.data_dir)
 
     left, right = st.columns(2)
     with left:
         st.subheader("Default configuration")
-        defaults_df = pd.DataFrame(
-            list(_flatten_dict(defaults_cfg.model_dump()).items()),
-            columns=["Setting", "Value"],
-        )
         st.table(defaults_df)
 
     with right:
@@ -2,9 +2,10 @@
 
 from __future__ import annotations
 
-import json
+import os
 from pathlib import Path
 
+import orjson
 import pandas as pd
 import streamlit as st
 
@@ -12,14 +13,20 @@ from synthap import runs_dir
 
 
 def _available_runs() -> list[str]:
-    return sorted([p.name for p in runs_dir().iterdir() if p.is_dir()])
+    with os.scandir(runs_dir()) as it:
+        return sorted([e.name for e in it if e.is_dir()])
+
+
+@st.cache_data(show_spinner=False)
+def _read_parquet(path: str, mtime_ns: int) -> pd.DataFrame:
+    """Read a run's parquet file; ``mtime_ns`` keys the cache."""
+    return pd.read_parquet(path, engine="pyarrow")
 
 
 def _load_json(path: Path) -> dict | None:
     if not path.exists():
         return None
-    with open(path, encoding="utf-8") as f:
-        return json.load(f)
+    return orjson.loads(path.read_bytes())
 
 
 def main() -> None:
@@ -44,10 +51,16 @@ def main() -> None:
     line_path = base / "invoice_lines.parquet"
     if inv_path.exists():
         st.subheader("Invoices")
-        st.dataframe(pd.read_parquet(inv_path), use_container_width=True)
+        st.dataframe(
+            _read_parquet(str(inv_path), inv_path.stat().st_mtime_ns),
+            use_container_width=True,
+        )
     if line_path.exists():
         st.subheader("Invoice lines")
-        st.dataframe(pd.read_parquet(line_path), use_container_width=True)
+        st.dataframe(
+            _read_parquet(str(line_path), line_path.stat().st_mtime_ns),
+            use_container_width=True,
+        )
 
 
 if __name__ == "__main__":  # pragma: no cover - streamlit entry point
@@ -4,36 +4,36 @@ from __future__ import annotations
 
 import random
 import secrets
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date
 
 import streamlit as st
 from slugify import slugify
 
 from synthap.ai.planner import plan_from_query
-from synthap.catalogs.loader import load_catalogs
 from synthap.cli import runs_dir
-from synthap.config.runtime_config import load_runtime_config
 from synthap.config.settings import settings
 from synthap.data.storage import to_rows, write_parquet
 from synthap.engine.generator import generate_from_plan
 from synthap.engine.payments import select_invoices_to_pay
 from synthap.engine.validators import validate_invoices
 from synthap.reports.report import write_json
+from synthap.ui_cache import cached_catalogs, cached_runtime_config
 
 
 def _vendor_options(cat):
-    return [v.name for v in cat.vendors]
+    return cat.vendor_names
 
 
 def _vendor_name_to_id(cat, names):
-    by_name = {v.name: v.id for v in cat.vendors}
+    by_name = cat.vendor_ids_by_name
     return [by_name[n] for n in names if n in by_name]
 
 
 def main() -> None:
     st.title("Generate invoices")
 
-    cat = load_catalogs(settings.data_dir)
+    cat = cached_catalogs(str(settings.data_dir))
 
     with st.form("gen_form"):
         query = st.text_area(
@@ -72,7 +72,7 @@ def main() -> None:
         st.error("Overdue invoices cannot exceed invoices to pay.")
         return
 
-    cfg = load_runtime_config(settings.data_dir)
+    cfg = cached_runtime_config(str(settings.data_dir))
     plan = plan_from_query(query, cat, today=date.today())
 
     if vendors:
@@ -103,8 +103,6 @@ def main() -> None:
     inv_df, line_df = to_rows(invoices)
     base = runs_dir() / run_id
     base.mkdir(parents=True, exist_ok=True)
-    write_parquet(inv_df, base / "invoices.parquet")
-    write_parquet(line_df, base / "invoice_lines.parquet")
 
     all_refs = [inv.reference for inv in invoices]
     rng = random.Random(seed)
@@ -115,7 +113,6 @@ def main() -> None:
         cfg.payments.pay_when_unspecified,
         rng,
     )
-    write_json({"run_id": run_id, "references": pay_refs}, base / "to_pay.json")
 
     report = {
         "run_id": run_id,
@@ -131,7 +128,19 @@ def main() -> None:
             "references": pay_refs,
         },
     }
-    write_json(report, base / "generation_report.json")
+
+    # The four artifacts are independent files, so write them in parallel
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        writes = [
+            pool.submit(write_parquet, inv_df, base / "invoices.parquet"),
+            pool.submit(write_parquet, line_df, base / "invoice_lines.parquet"),
+            pool.submit(
+                write_json, {"run_id": run_id, "references": pay_refs}, base / "to_pay.json"
+            ),
+            pool.submit(write_json, report, base / "generation_report.json"),
+        ]
+    for write in writes:
+        write.result()
     st.success(f"Generated run {run_id}")
 
     st.session_state["last_seed"] = str(seed)
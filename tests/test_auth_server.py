@@ -0,0 +1,37 @@
+import sys
+import types
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+fake_settings = types.ModuleType("synthap.config.settings")
+
+
+class DummySettings:
+    xero_tenant_id = None
+    xero_redirect_uri = "http://localhost:5050/callback"
+
+
+fake_settings.settings = DummySettings()
+sys.modules.setdefault("synthap.config.settings", fake_settings)
+
+from synthap.xero.auth_server import _listening_pids  # noqa: E402
+
+# German Windows output: the State column is localized
+NETSTAT = """
+Aktive Verbindungen
+
+  Proto  Lokale Adresse         Remoteadresse          Status           PID
+  TCP    0.0.0.0:135            0.0.0.0:0              ABHÖREN          1024
+  TCP    0.0.0.0:5050           0.0.0.0:0              ABHÖREN          4321
+  TCP    0.0.0.0:15050          0.0.0.0:0              ABHÖREN          99
+  TCP    127.0.0.1:5050         127.0.0.1:50123        HERGESTELLT      4321
+  TCP    127.0.0.1:50123        127.0.0.1:5050         HERGESTELLT      777
+  TCP    [::]:5050              [::]:0                 ABHÖREN          4322
+  TCP    0.0.0.0:5050           0.0.0.0:0              ABHÖREN          0
+"""
+
+
+def test_listening_pids_ignores_state_text_and_connections():
+    assert _listening_pids(NETSTAT, 5050) == {4321, 4322}
+    assert _listening_pids(NETSTAT, 8080) == set()
@@ -46,3 +46,17 @@ def test_decimal_bill_count_invalid():
             catalogs=cat,
         )
 
+
+
+def test_line_range_phrasings():
+    today = date(2024, 1, 1)
+    cases = {
+        "Generate 5 bills with 4-2 line items": (2, 4),
+        "Generate 5 bills with between 1 and 3 lines": (1, 3),
+        "Generate 5 bills with 2 to 5 line items": (2, 5),
+        "Generate 5 bills with 3 line items": (3, 3),
+        "Generate 5 bills": (None, None),
+    }
+    for text, expected in cases.items():
+        pq = parse_nlp_to_query(text, today=today)
+        assert (pq.min_lines_per_invoice, pq.max_lines_per_invoice) == expected
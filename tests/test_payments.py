@@ -9,6 +9,7 @@ sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
 import pandas as pd
 
 from synthap.nlp.parser import parse_nlp_to_query
+from synthap.engine import payments as payments_mod
 from synthap.engine.payments import generate_payments
 from synthap.engine.payments import select_invoices_to_pay
 
@@ -63,7 +64,7 @@ def test_generate_payments_date_within_term(monkeypatch):
         }
     ]
 
-    monkeypatch.setattr(random, "randint", lambda a, b: 0)
+    monkeypatch.setattr(payments_mod, "_random_offsets", lambda spans: [0] * len(spans))
     payments = generate_payments(invoices, account_code="101")
     assert payments[0]["Date"] == "2024-01-01"
     assert payments[0]["Date"] < "2024-01-10"
@@ -92,7 +93,7 @@ def test_generate_payments_overdue(monkeypatch):
             "DueDateString": "2024-01-10T00:00:00",
         }
     ]
-    monkeypatch.setattr(random, "randint", lambda a, b: 0)
+    monkeypatch.setattr(payments_mod, "_random_offsets", lambda spans: [0] * len(spans))
     payments = generate_payments(
         invoices,
         account_code="101",
@@ -220,3 +221,36 @@ def test_insert_writes_reports_with_xero_data(tmp_path, monkeypatch):
     assert pay_report["payments"][0]["PaymentID"] == "pay1"
     actions = [e["action"] for e in log_report["events"]]
     assert "post_invoices" in actions and "post_payments" in actions
+
+
+def test_select_invoices_to_pay_is_deterministic_and_unique():
+    all_refs = [f"R{i}" for i in range(100)]
+    first = select_invoices_to_pay(all_refs, 40, False, False, random.Random(7))
+    second = select_invoices_to_pay(all_refs, 40, False, False, random.Random(7))
+    assert first == second
+    assert len(set(first)) == 40
+    assert set(first) <= set(all_refs)
+
+
+def test_generate_payments_legacy_xero_dates():
+    invoices = [
+        {
+            "InvoiceID": "1",
+            "AmountDue": 100,
+            "DateString": "/Date(1704067200000+0000)/",
+            "DueDateString": "/Date(1704844800000+0000)/",
+        }
+    ]
+
+    payments = generate_payments(invoices, account_code="101", pay_on_due_date=True)
+    assert payments[0]["Date"] == "2024-01-10"
+
+
+def test_generate_payments_skips_settled_invoices():
+    invoices = [
+        {"InvoiceID": "1", "AmountDue": 0, "Total": 100},
+        {"InvoiceID": "2", "Total": 50},
+    ]
+    payments = generate_payments(invoices, payment_date=date(2024, 1, 1))
+    assert [p["Invoice"]["InvoiceID"] for p in payments] == ["2"]
+    assert payments[0]["Amount"] == 50
@@ -31,9 +31,10 @@ def test_post_payments_uses_put(monkeypatch):
         async def __aexit__(self, exc_type, exc, tb):
             pass
 
-        async def put(self, url, json, headers):
+        async def put(self, url, content, headers):
             called['method'] = 'PUT'
-            return httpx.Response(200, json={"Payments": []})
+            called['body'] = content
+            return httpx.Response(200, json={"Payments": [{"PaymentID": "p1"}]})
 
     monkeypatch.setattr(httpx, "AsyncClient", lambda *a, **kw: DummyClient())
     monkeypatch.setattr(xc.TokenStore, "load", staticmethod(lambda: {"access_token": "tok"}))
@@ -52,5 +53,30 @@ def test_post_payments_uses_put(monkeypatch):
         }
     ]
 
-    asyncio.run(xc.post_payments(payments))
+    result = asyncio.run(xc.post_payments(payments))
     assert called.get('method') == 'PUT'
+    assert xc.orjson.loads(called['body']) == {"Payments": payments}
+    assert result == {"Payments": [{"PaymentID": "p1"}]}
+
+
+def test_refused_batch_lets_in_flight_batches_finish(monkeypatch):
+    monkeypatch.setattr(xc, "INVOICES_PER_CALL", 1)
+    monkeypatch.setattr(xc, "MAX_CONCURRENT_REQUESTS", 2)
+    posted = []
+
+    async def fake_post(batch):
+        ref = batch[0]["Reference"]
+        posted.append(ref)
+        if ref == "A":
+            # Still waiting on Xero when batch B is refused
+            await asyncio.sleep(0.01)
+            return {"Invoices": [{"Reference": "A"}]}
+        raise xc.XeroRequestRefused(429, "rate limited")
+
+    invoices = [{"Reference": r} for r in "ABC"]
+    results = asyncio.run(xc.post_invoices_batched(invoices, fake_post))
+
+    assert posted == ["A", "B"]  # C is never sent
+    assert results[0] == ([{"Reference": "A"}], {"Invoices": [{"Reference": "A"}]})
+    assert isinstance(results[1][1], xc.XeroRequestRefused)
+    assert results[2][1] is results[1][1]
@@ -0,0 +1,64 @@
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from synthap.xero.mapper import map_staged_invoices, vendor_ids_by_reference
+
+
+def _frames():
+    inv_df = pd.DataFrame(
+        [
+            {
+                "reference": "B",
+                "contact_id": "c2",
+                "currency": "AUD",
+                "date": "2024-01-02",
+                "due_date": "2024-02-02",
+                "status": "AUTHORISED",
+                "vendor_id": "v2",
+            },
+            {
+                "reference": "A",
+                "contact_id": "c1",
+                "currency": "AUD",
+                "date": "2024-01-01",
+                "due_date": "2024-02-01",
+                "status": "AUTHORISED",
+                "vendor_id": "v1",
+            },
+        ]
+    )
+    line_df = pd.DataFrame(
+        [
+            {"reference": "B", "description": "x", "quantity": 2, "unit_amount": 5,
+             "account_code": 200, "tax_type": "INPUT", "line_amount": 10},
+            {"reference": "A", "description": "y", "quantity": 1, "unit_amount": 3,
+             "account_code": 310, "tax_type": "NONE", "line_amount": 3},
+            {"reference": "B", "description": "z", "quantity": 1, "unit_amount": 1,
+             "account_code": 200, "tax_type": "INPUT", "line_amount": 1},
+        ]
+    )
+    return inv_df, line_df
+
+
+def test_map_staged_invoices_groups_lines_by_reference():
+    inv_df, line_df = _frames()
+    payloads = map_staged_invoices(inv_df, line_df)
+
+    assert [p["Reference"] for p in payloads] == ["A", "B"]
+    b = payloads[1]
+    assert b["Contact"] == {"ContactID": "c2"}
+    assert b["InvoiceNumber"] == "B"  # falls back to the reference
+    assert [ln["Description"] for ln in b["LineItems"]] == ["x", "z"]
+    assert b["LineItems"][0] == {
+        "Description": "x",
+        "Quantity": 2.0,
+        "UnitAmount": 5.0,
+        "AccountCode": "200",
+        "TaxType": "INPUT",
+        "LineAmount": 10.0,
+    }
+    assert vendor_ids_by_reference(inv_df) == {"B": "v2", "A": "v1"}
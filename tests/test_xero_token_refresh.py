@@ -1,5 +1,6 @@
 import asyncio
 import sys
+import time
 import types
 from pathlib import Path
 
@@ -79,7 +80,7 @@ def test_post_invoices_refreshes_and_uses_new_token(monkeypatch):
                 json=[{"tenantType": "ORGANISATION", "tenantId": "TEN"}],
                 request=httpx.Request("GET", url),
             )
-        async def post(self, url, json, headers):
+        async def post(self, url, content, headers):
             assert headers["Authorization"] == "Bearer new"
             return httpx.Response(200, json={"Invoices": []}, request=httpx.Request("POST", url))
 
@@ -93,3 +94,52 @@ def test_post_invoices_refreshes_and_uses_new_token(monkeypatch):
     monkeypatch.setattr(xc, "refresh_token_if_needed", fake_refresh)
 
     asyncio.run(xc.post_invoices([{}]))
+
+
+def test_token_is_fresh_uses_expires_at():
+    from synthap.xero.oauth import token_is_fresh
+
+    now = time.time()
+    assert token_is_fresh({"access_token": "a", "expires_at": now + 60})
+    assert not token_is_fresh({"access_token": "a", "expires_at": now - 1})
+    # Tokens saved before expiry stamping rely on the 401 refresh path
+    assert token_is_fresh({"access_token": "a"})
+    assert not token_is_fresh(None)
+
+
+def test_refresh_skips_connections_lookup_only_when_tenant_known(monkeypatch):
+    from synthap.xero import oauth
+
+    for name in ("xero_client_id", "xero_client_secret"):
+        monkeypatch.setattr(oauth.settings, name, "x", raising=False)
+    paths = []
+
+    def handler(request):
+        paths.append(request.url.path)
+        if request.url.path == "/connect/token":
+            return httpx.Response(200, json={"access_token": "new", "refresh_token": "r2"})
+        return httpx.Response(200, json=[{"tenantType": "ORGANISATION", "tenantId": "TEN"}])
+
+    async def refresh(stored, **kw):
+        monkeypatch.setattr(oauth.TokenStore, "load", staticmethod(lambda: dict(stored)))
+        monkeypatch.setattr(oauth.TokenStore, "save", staticmethod(lambda t: None))
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            monkeypatch.setattr(oauth, "_get_client", lambda: client)
+            return await oauth.refresh_token_if_needed(**kw)
+
+    tok = asyncio.run(refresh({"access_token": "old", "refresh_token": "r", "tenant_id": "OLD"}))
+    assert tok["tenant_id"] == "OLD"
+    assert paths == ["/connect/token"]
+
+    paths.clear()
+    tok = asyncio.run(refresh({"access_token": "old", "refresh_token": "r"}))
+    assert tok["tenant_id"] == "TEN"
+    assert paths == ["/connect/token", "/connections"]
+
+    paths.clear()
+    tok = asyncio.run(refresh(
+        {"access_token": "old", "refresh_token": "r", "tenant_id": "OLD"},
+        force_refresh_tenant=True,
+    ))
+    assert tok["tenant_id"] == "TEN"
+    assert paths == ["/connect/token", "/connections"]